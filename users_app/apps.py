@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users_app'
+
+    def ready(self):
+        """
+        Drop users from the cache of CachedModelBackend when they are saved
+        or deleted, so a changed password or a deactivated account takes
+        effect on the next request.
+        """
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save
+
+        from .backends import forget_user
+
+        post_save.connect(forget_user, sender=get_user_model(), dispatch_uid='forget_saved_user')
+        post_delete.connect(forget_user, sender=get_user_model(), dispatch_uid='forget_deleted_user')
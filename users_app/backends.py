@@ -0,0 +1,51 @@
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_cache_key(user_id) -> str:
+    """
+    Return the cache key of the user with the given id.
+    """
+    return f'users_app:user:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that keeps the users it loads for every request in the
+    cache for USER_CACHE_TIMEOUT seconds, so AuthenticationMiddleware does
+    not query auth_user on each request.
+
+    Saving or deleting a user drops it from the cache (see UsersConfig.ready).
+    Updates made with QuerySet.update() send no signal and show up once the
+    cached copy expires. Logging in still checks the password against the
+    database.
+    """
+
+    def get_user(self, user_id) -> Optional[object]:
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
+
+    async def aget_user(self, user_id) -> Optional[object]:
+        key = user_cache_key(user_id)
+        user = await cache.aget(key)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                await cache.aset(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
+
+
+def forget_user(sender, instance, **kwargs) -> None:
+    """
+    Drop a saved or deleted user from the cache.
+    """
+    cache.delete(user_cache_key(instance.pk))
+
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the number of iterations taken from the
+    PASSWORD_PBKDF2_ITERATIONS setting instead of Django's default, so the
+    CPU cost of each login is chosen for the servers it runs on (see the
+    benchmark_hashers command).
+
+    It keeps the pbkdf2_sha256 algorithm name, so it also checks the hashes
+    already stored. A hash with a different number of iterations is
+    rewritten with the configured number the next time its user logs in.
+    """
+
+    @property
+    def iterations(self) -> int:
+        return settings.PASSWORD_PBKDF2_ITERATIONS
@@ -0,0 +1,97 @@
+import statistics
+import time
+import uuid
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache, caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from users_app.backends import user_cache_key
+
+MODES = [
+    ('database session and user', 'django.contrib.sessions.backends.db', 'django.contrib.auth.backends.ModelBackend'),
+    ('cached session and user', 'django.contrib.sessions.backends.cached_db', 'users_app.backends.CachedModelBackend'),
+]
+
+
+class Command(BaseCommand):
+    help = "Count the queries and time spent loading the session and the logged-in user on each request."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help="Number of simulated requests per mode.")
+        parser.add_argument('--username', help="Existing user to log in as. By default a temporary user is created and deleted afterwards.")
+
+    def handle(self, *args, **options):
+        """
+        Send simulated requests of a logged-in user through SessionMiddleware
+        and AuthenticationMiddleware only, with the session and user stored
+        in the database, then cached. The first request of each mode starts
+        with an empty cache; the following ones show the fixed cost every
+        page pays before its view runs.
+
+        Only the cache entries of the benchmark's own session and user are
+        touched, so it can run next to a live site sharing the cache.
+        """
+        if options['username']:
+            try:
+                user = User.objects.get(username=options['username'])
+            except User.DoesNotExist:
+                raise CommandError(f"There is no user {options['username']}.")
+        else:
+            user = User.objects.create_user(username=f'benchmark-{uuid.uuid4().hex}@example.com')
+        try:
+            self.stdout.write(f"{'mode':<28}{'first queries':>15}{'then queries':>14}{'median ms':>11}")
+            for name, engine, backend in MODES:
+                with override_settings(SESSION_ENGINE=engine, AUTHENTICATION_BACKENDS=[backend]):
+                    first, queries, timings = self.measure(user, engine, backend, options['requests'])
+                self.stdout.write(f"{name:<28}{first:>15}{statistics.median(queries):>14g}{statistics.median(timings):>11.3f}")
+        finally:
+            if not options['username']:
+                user.delete()
+
+    def measure(self, user, engine, backend, requests):
+        """
+        Return the number of queries of the first request, then the number
+        of queries and the time in milliseconds of each of the following
+        ones.
+        """
+        session = import_module(engine).SessionStore()
+        session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        session[BACKEND_SESSION_KEY] = backend
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        # Start from a cold cache: cached_db sessions are written to the
+        # cache when saved.
+        if hasattr(session, 'cache_key'):
+            caches[settings.SESSION_CACHE_ALIAS].delete(session.cache_key)
+        cache.delete(user_cache_key(user.pk))
+
+        def view(request):
+            return HttpResponse(str(request.user.is_authenticated))
+
+        handler = SessionMiddleware(AuthenticationMiddleware(view))
+        factory = RequestFactory()
+        factory.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+        queries, timings = [], []
+        try:
+            for _ in range(requests + 1):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = handler(factory.get('/'))
+                    timings.append((time.perf_counter() - started) * 1000)
+                if response.content != b'True':
+                    raise CommandError("The simulated request was not logged in.")
+                queries.append(len(captured))
+        finally:
+            session.delete()
+            cache.delete(user_cache_key(user.pk))
+        return queries[0], queries[1:], timings[1:]
@@ -0,0 +1,100 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, BCryptSHA256PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher, get_hashers,
+)
+from django.core.management.base import BaseCommand
+
+from users_app.hashers import TunedPBKDF2PasswordHasher
+
+
+class Command(BaseCommand):
+    help = "Time password verification with the configured hashers at several costs and recommend one for a target latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=250, help="Longest acceptable time to check one password, in milliseconds.")
+        parser.add_argument('--repeat', type=int, default=3, help="Number of timed checks of each cost.")
+        parser.add_argument('--pbkdf2-iterations', type=int, nargs='+', default=[100_000, 250_000, 500_000, 1_000_000, 1_500_000], help="PBKDF2 iteration counts to try.")
+        parser.add_argument('--argon2-time-costs', type=int, nargs='+', default=[1, 2, 3, 4], help="Argon2 time costs to try, at the default memory cost.")
+        parser.add_argument('--scrypt-work-factors', type=int, nargs='+', default=[2**13, 2**14, 2**15], help="scrypt work factors (N) to try.")
+        parser.add_argument('--bcrypt-rounds', type=int, nargs='+', default=[10, 12, 13], help="bcrypt rounds to try.")
+
+    def handle(self, *args, **options):
+        """
+        For each hasher in PASSWORD_HASHERS whose library is installed,
+        hash a password at each cost and time checking it, which is what
+        every login pays. Print the median times and, per algorithm, the
+        highest cost within --target-ms.
+        """
+        target = options['target_ms']
+        recommendations = []
+        self.stdout.write(f"{'algorithm':<16}{'cost':>22}{'median ms':>12}")
+        seen = set()
+        for hasher in get_hashers():
+            if hasher.algorithm in seen:
+                continue
+            seen.add(hasher.algorithm)
+            variants = self.variants(hasher, options)
+            if variants is None:
+                continue
+            if hasher.library:
+                try:
+                    hasher._load_library()
+                except ValueError:
+                    self.stdout.write(f"{hasher.algorithm:<16}{'library not installed':>22}")
+                    continue
+            best = None
+            for label, value, variant in variants:
+                median = self.time_verify(variant, options['repeat'])
+                self.stdout.write(f"{hasher.algorithm:<16}{label:>22}{median:>12.1f}")
+                if median <= target:
+                    best = (label, value, median)
+            recommendations.append((hasher, best))
+
+        self.stdout.write(f"\nRecommended costs for checking a password in at most {target:g} ms:")
+        for hasher, best in recommendations:
+            if best is None:
+                self.stdout.write(f"  {hasher.algorithm}: every cost tried is slower; try lower ones.")
+            elif isinstance(hasher, TunedPBKDF2PasswordHasher):
+                self.stdout.write(f"  {hasher.algorithm}: {best[0]} ({best[2]:.1f} ms) -> PASSWORD_PBKDF2_ITERATIONS = {best[1]}")
+            else:
+                self.stdout.write(f"  {hasher.algorithm}: {best[0]} ({best[2]:.1f} ms)")
+        self.stdout.write(f"Current PASSWORD_PBKDF2_ITERATIONS = {settings.PASSWORD_PBKDF2_ITERATIONS}")
+
+    def variants(self, hasher, options):
+        """
+        Return (label, cost, hasher) triples for the costs to try with
+        ``hasher``, or None for an algorithm without a tunable cost.
+        """
+        def tuned(**attributes):
+            return type(f'Benchmark{type(hasher).__name__}', (type(hasher),), attributes)()
+
+        if isinstance(hasher, PBKDF2PasswordHasher):
+            return [(f'{count:,} iterations', count, tuned(iterations=count)) for count in options['pbkdf2_iterations']]
+        if isinstance(hasher, Argon2PasswordHasher):
+            return [(f'time cost {cost}', cost, tuned(time_cost=cost)) for cost in options['argon2_time_costs']]
+        if isinstance(hasher, ScryptPasswordHasher):
+            # hashlib refuses to use more than 32 MiB unless told otherwise.
+            return [
+                (f'N={factor}', factor, tuned(work_factor=factor, maxmem=256 * factor * hasher.block_size))
+                for factor in options['scrypt_work_factors']
+            ]
+        if isinstance(hasher, BCryptSHA256PasswordHasher):
+            return [(f'{rounds} rounds', rounds, tuned(rounds=rounds)) for rounds in options['bcrypt_rounds']]
+        return None
+
+    def time_verify(self, hasher, repeat: int) -> float:
+        """
+        Return the median time in milliseconds ``hasher`` takes to check a
+        password.
+        """
+        password = 'correct horse battery staple'
+        encoded = hasher.encode(password, hasher.salt())
+        timings = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            hasher.verify(password, encoded)
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
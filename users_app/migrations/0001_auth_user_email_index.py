@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Index auth_user.email, which UserRegisterForm.clean_email filters on for
+    every sign up. auth.User belongs to Django, so the index is created with
+    plain SQL rather than through the model's Meta.
+    """
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS users_app_auth_user_email_idx ON auth_user (email);',
+            'DROP INDEX IF EXISTS users_app_auth_user_email_idx;',
+        ),
+    ]
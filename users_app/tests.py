@@ -1,7 +1,16 @@
+import io
+import time
+from unittest import mock
 from django.test import TestCase
-from django.core.management import call_command
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.urls import reverse
+from .backends import CachedModelBackend
+from .throttling import TokenBucket, rejection_count
+from vacations_project.testing import load_initial_data
 # Create your tests here.
 class UserTestCase(TestCase):
     @classmethod
@@ -18,7 +27,7 @@ class UserTestCase(TestCase):
         - Retrieves test user and admin
         - Retrieves passwords for test user and admin
         """
-        call_command('loaddata', 'initial_data.json')
+        load_initial_data()
         cls.user = User.objects.get(username='testuser@example.com')
         cls.user_password = 'UserPass123'
         cls.admin = User.objects.get(username='admin@example.com')
@@ -26,6 +35,13 @@ class UserTestCase(TestCase):
 
         super().setUpTestData()
 
+    def setUp(self):
+        """
+        Clear the cache, which keeps the login throttle buckets and the
+        cached users, so every test starts with its own.
+        """
+        cache.clear()
+
     def test_user(self):
         """
         This test checks that the test user is correctly set up.
@@ -216,4 +232,125 @@ class UserTestCase(TestCase):
         self.assertContains(response, 'This password is too short. It must contain at least 8 characters.')
 
 
-    
\ No newline at end of file
+    
+
+    def test_logged_in_user_is_cached(self):
+        """
+        This test checks that CachedModelBackend loads a user from the
+        database only once, and that saving the user drops the cached copy,
+        so changing the password logs the user out on the next request.
+        """
+        cache.clear()
+        backend = CachedModelBackend()
+        self.assertEqual(backend.get_user(self.user.pk), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(backend.get_user(self.user.pk).first_name, 'Test')
+        self.user.first_name = 'Changed'
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(backend.get_user(self.user.pk).first_name, 'Changed')
+
+        self.client.login(username=self.user.username, password=self.user_password)
+        self.assertEqual(self.client.get(reverse('home')).status_code, 200)
+        self.user.set_password('AnotherPass456')
+        self.user.save()
+        self.assertRedirects(self.client.get(reverse('home')), f"{reverse('login')}?next=/", fetch_redirect_response=False)
+
+    def test_session_and_user_cost_no_query_when_cached(self):
+        """
+        This test checks that with cached sessions and users a logged-in
+        request runs no query before the view, and that the auth benchmark
+        reports it.
+        """
+        self.client.login(username=self.user.username, password=self.user_password)
+        self.client.get(reverse('login'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('login'))
+        self.assertEqual(len(queries), 0)
+
+        out = io.StringIO()
+        cache.set('unrelated', 'kept')
+        users = User.objects.count()
+        call_command('benchmark_auth', requests=3, stdout=out)
+        self.assertEqual(cache.get('unrelated'), 'kept')
+        self.assertEqual(User.objects.count(), users)
+        rows = {line[:28].strip(): line[28:].split() for line in out.getvalue().splitlines()[1:]}
+        self.assertEqual(rows['database session and user'][:2], ['2', '2'])
+        self.assertEqual(rows['cached session and user'][:2], ['2', '0'])
+
+    def test_login_and_signup_are_throttled(self):
+        """
+        This test checks that login attempts beyond the username bucket are
+        rejected with a 429 status before any password is checked, that the
+        rejections are counted, and that the bucket refills over time.
+        """
+        cache.clear()
+        rates = {'ip': (10, 60), 'username': (2, 6)}
+        attempt = {'username': self.user.username, 'password': 'wrong password'}
+        with self.settings(AUTH_THROTTLE_RATES=rates), mock.patch('django.contrib.auth.forms.authenticate', return_value=None) as authenticate:
+            for _ in range(2):
+                self.assertEqual(self.client.post(reverse('login'), attempt).status_code, 200)
+            with self.assertLogs('users_app.throttling', 'WARNING'):
+                response = self.client.post(reverse('login'), {**attempt, 'username': self.user.username.upper()})
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response['Retry-After'], '10')
+            self.assertContains(response, 'Too many attempts', status_code=429)
+            self.assertEqual(authenticate.call_count, 2)
+            self.assertEqual(rejection_count('username'), 1)
+
+            self.assertEqual(self.client.post(reverse('login'), {**attempt, 'username': self.admin.username}).status_code, 200)
+            with mock.patch('users_app.throttling.time.time', return_value=time.time() + 10):
+                self.assertEqual(self.client.post(reverse('login'), attempt).status_code, 200)
+
+        with self.settings(AUTH_THROTTLE_RATES={'ip': (1, 1)}), self.assertLogs('users_app.throttling', 'WARNING'):
+            signup = {'email': 'new@example.com', 'first_name': 'first', 'last_name': 'last', 'password1': 'newpassword232323', 'password2': 'newpassword232323'}
+            self.assertEqual(self.client.post(reverse('signup'), signup).status_code, 302)
+            self.assertEqual(self.client.post(reverse('signup'), {**signup, 'email': 'other@example.com'}).status_code, 429)
+        self.assertFalse(User.objects.filter(email='other@example.com').exists())
+        self.assertEqual(rejection_count('ip'), 1)
+
+    def test_throttle_falls_back_to_memory(self):
+        """
+        This test checks that the buckets are kept in memory when the cache
+        stores nothing.
+        """
+        dummy = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        with self.settings(CACHES=dummy):
+            bucket = TokenBucket('test', 1, 1 / 60)
+            self.assertEqual(bucket.take('client'), 0)
+            self.assertGreater(bucket.take('client'), 59)
+
+
+    def test_login_upgrades_password_hash(self):
+        """
+        This test checks that logging in through the login form rewrites a
+        password hash made with another iteration count with the configured
+        one, and that the user can still log in afterwards.
+        """
+        hashers = ['users_app.hashers.TunedPBKDF2PasswordHasher', 'django.contrib.auth.hashers.MD5PasswordHasher']
+        with self.settings(PASSWORD_HASHERS=hashers, PASSWORD_PBKDF2_ITERATIONS=1000, AUTH_THROTTLE_RATES={}):
+            self.user.set_password(self.user_password)
+            self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+            self.user.save()
+            with self.settings(PASSWORD_PBKDF2_ITERATIONS=1200):
+                response = self.client.post(reverse('login'), {'username': self.user.username, 'password': self.user_password})
+                self.assertEqual(response.status_code, 302)
+                self.user.refresh_from_db()
+                self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1200$'))
+                self.client.logout()
+                response = self.client.post(reverse('login'), {'username': self.user.username, 'password': self.user_password})
+                self.assertEqual(response.status_code, 302)
+
+    def test_benchmark_hashers(self):
+        """
+        This test checks that benchmark_hashers times every cost given and
+        recommends the PBKDF2 iteration count within the target.
+        """
+        out = io.StringIO()
+        hashers = ['users_app.hashers.TunedPBKDF2PasswordHasher', 'django.contrib.auth.hashers.ScryptPasswordHasher']
+        with self.settings(PASSWORD_HASHERS=hashers):
+            call_command('benchmark_hashers', target_ms=10_000, repeat=1, pbkdf2_iterations=[1000, 2000], scrypt_work_factors=[2**10], stdout=out)
+        output = out.getvalue()
+        self.assertIn('2,000 iterations', output)
+        self.assertIn('PASSWORD_PBKDF2_ITERATIONS = 2000', output)
+        self.assertIn('N=1024', output)
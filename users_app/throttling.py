@@ -0,0 +1,197 @@
+"""
+Token-bucket throttling of the login and signup forms.
+
+Each attempt to log in or sign up hashes a password, which costs a large
+fraction of a second of CPU, so a burst of attempts can starve the workers
+serving everything else. ThrottleMixin takes a token from a bucket per
+client IP address and a bucket per username before the form is processed,
+and answers 429 Too Many Requests, without hashing anything, when a bucket
+is empty.
+
+The buckets are kept in the THROTTLE_CACHE cache, shared by every worker
+when that cache is. If the cache fails, or is a DummyCache that stores
+nothing, they fall back to memory in the current process.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.http import HttpRequest
+
+logger = logging.getLogger('users_app.throttling')
+
+
+class LocalStore:
+    """
+    Minimal thread-safe in-memory stand-in for the cache, with the get, set
+    and incr calls the buckets use.
+    """
+
+    def __init__(self) -> None:
+        self.values: Dict[str, Tuple[object, float]] = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        with self.lock:
+            value, expires = self.values.get(key, (default, math.inf))
+            if expires < time.monotonic():
+                del self.values[key]
+                return default
+            return value
+
+    def set(self, key: str, value, timeout: Optional[float] = None) -> None:
+        with self.lock:
+            self.values[key] = (value, time.monotonic() + timeout if timeout else math.inf)
+
+    def incr(self, key: str, delta: int = 1) -> int:
+        with self.lock:
+            value, expires = self.values.get(key, (0, math.inf))
+            self.values[key] = (value + delta, expires)
+            return value + delta
+
+
+local_store = LocalStore()
+
+
+def store():
+    """
+    Return the cache the buckets are kept in, or the in-memory fallback if
+    the configured cache keeps nothing.
+    """
+    cache = caches[settings.THROTTLE_CACHE]
+    return local_store if isinstance(cache, DummyCache) else cache
+
+
+class TokenBucket:
+    """
+    A bucket holding up to ``capacity`` tokens and refilled with ``rate``
+    tokens per second, so it allows bursts of ``capacity`` attempts and
+    ``rate`` attempts per second on average.
+
+    Reading and writing a bucket are two cache calls, so two attempts at the
+    same moment can both take the last token; that is fine for throttling.
+    """
+
+    def __init__(self, scope: str, capacity: float, rate: float) -> None:
+        self.scope = scope
+        self.capacity = capacity
+        self.rate = rate
+
+    def key(self, identity: str) -> str:
+        digest = hashlib.sha256(identity.encode()).hexdigest()
+        return f'users_app:throttle:{self.scope}:{digest}'
+
+    def take(self, identity: str) -> float:
+        """
+        Take a token from the bucket of ``identity``. Return 0 if there was
+        one, otherwise the number of seconds until there will be.
+        """
+        key = self.key(identity)
+        now = time.time()
+        # A bucket left alone long enough to fill up is simply forgotten.
+        timeout = math.ceil(self.capacity / self.rate)
+        try:
+            return self._take(store(), key, now, timeout)
+        except Exception:
+            logger.exception("Throttle cache failed, using the in-memory fallback.")
+            return self._take(local_store, key, now, timeout)
+
+    def _take(self, backend, key: str, now: float, timeout: int) -> float:
+        tokens, updated = backend.get(key) or (self.capacity, now)
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            backend.set(key, (tokens - 1, now), timeout)
+            return 0.0
+        backend.set(key, (tokens, now), timeout)
+        return (1 - tokens) / self.rate
+
+
+def record_rejection(scope: str) -> None:
+    """
+    Count an attempt rejected because of the ``scope`` bucket (see
+    rejection_count).
+    """
+    key = f'users_app:throttle:rejected:{scope}'
+    try:
+        backend = store()
+        try:
+            backend.incr(key)
+        except ValueError:
+            backend.set(key, 1, None)
+    except Exception:
+        local_store.incr(key)
+
+
+def rejection_count(scope: str) -> int:
+    """
+    Return the number of attempts rejected because of the ``scope`` bucket
+    since the cache was last cleared.
+    """
+    key = f'users_app:throttle:rejected:{scope}'
+    try:
+        return store().get(key, 0)
+    except Exception:
+        return local_store.get(key, 0)
+
+
+def client_ip(request: HttpRequest) -> str:
+    """
+    Return the IP address of the client. Behind a proxy this is the proxy's
+    address unless the proxy sets REMOTE_ADDR from X-Forwarded-For.
+    """
+    return request.META.get('REMOTE_ADDR', '')
+
+
+class ThrottleMixin:
+    """
+    Throttle the POST requests of a form view by client IP address and by
+    the username field ``throttle_username_field``, with the buckets of
+    AUTH_THROTTLE_RATES. Rejected requests get the form again with an error
+    message and a 429 status.
+    """
+    throttle_username_field = 'username'
+
+    def post(self, request, *args, **kwargs):
+        identities = {
+            'ip': client_ip(request),
+            'username': request.POST.get(self.throttle_username_field, '').strip().lower(),
+        }
+        for scope, (capacity, per_minute) in settings.AUTH_THROTTLE_RATES.items():
+            identity = identities.get(scope)
+            if not identity:
+                continue
+            wait = TokenBucket(scope, capacity, per_minute / 60).take(identity)
+            if wait:
+                return self.throttled(request, scope, wait)
+        return super().post(request, *args, **kwargs)
+
+    def throttled(self, request, scope: str, wait: float):
+        """
+        Return the 429 response of an attempt rejected by the ``scope``
+        bucket, which will have a token in ``wait`` seconds.
+        """
+        record_rejection(scope)
+        retry_after = math.ceil(wait)
+        logger.warning(
+            'throttled view=%s scope=%s retry_after=%d', type(self).__name__, scope, retry_after,
+            extra={'scope': scope, 'view': type(self).__name__},
+        )
+        messages.error(request, f"Too many attempts. Please try again in {retry_after} seconds.")
+        # The form is shown again empty: a bound form would be validated
+        # while rendering, which checks the password.
+        form_kwargs = self.get_form_kwargs()
+        form_kwargs.pop('data', None)
+        form_kwargs.pop('files', None)
+        # CreateView's context expects the object its post() would have set.
+        self.object = None
+        response = self.render_to_response(self.get_context_data(form=self.get_form_class()(**form_kwargs)), status=429)
+        response['Retry-After'] = str(retry_after)
+        return response
@@ -1,4 +1,5 @@
 from users_app.forms import UserRegisterForm,UserLoginForm
+from users_app.throttling import ThrottleMixin
 from django.shortcuts import render
 from django.views.generic.edit import CreateView
 from django.contrib.auth.views import LoginView,LogoutView
@@ -8,7 +9,8 @@ from typing import Dict, Any
 # Create your views here.
 
 
-class RegisterView(CreateView):
+class RegisterView(ThrottleMixin, CreateView):
+    throttle_username_field = 'email'
     form_class = UserRegisterForm
     template_name = 'signup.html'
     success_url = reverse_lazy('login')
@@ -24,7 +26,7 @@ class RegisterView(CreateView):
         context['form_type'] = 'signup'
         return context
 
-class LoginView(LoginView):
+class LoginView(ThrottleMixin, LoginView):
     form_class = UserLoginForm
     template_name = 'login.html'
     success_url = reverse_lazy('home')
@@ -1,3 +1,25 @@
 from django.contrib import admin
+from django.utils import timezone
+
+from .models import ImageJob
 
 # Register your models here.
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'vacation', 'status', 'attempts', 'created_at', 'started_at', 'finished_at', 'last_error')
+    list_filter = ('status',)
+    list_select_related = ('vacation',)
+    readonly_fields = ('vacation', 'attempts', 'last_error', 'created_at', 'started_at', 'finished_at')
+    actions = ['retry']
+
+    @admin.action(description="Retry the selected jobs")
+    def retry(self, request, queryset):
+        """
+        Queue the selected jobs to run again as soon as a worker is free.
+        """
+        updated = queryset.exclude(status=ImageJob.Status.RUNNING).update(
+            status=ImageJob.Status.PENDING, run_after=timezone.now(), attempts=0, last_error='',
+        )
+        self.message_user(request, f"{updated} jobs queued again.")
@@ -0,0 +1,74 @@
+import hashlib
+
+from django.db.models import Count, Max, QuerySet, Sum
+from django.http import HttpRequest
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.generics import ListAPIView
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+
+from vacations_app.models import Likes, Vacation
+from vacations_app.serializers import VacationFilterSerializer, VacationSerializer
+
+
+def catalog_etag(request: HttpRequest) -> str:
+    """
+    Return an ETag for a vacations API response.
+
+    The tag is derived from the last change to the catalog (the newest
+    updated_at, the number of vacations, the total of their like counters
+    and the newest like) together with the full request path, so any
+    change to a vacation, a like or the query string produces a new tag.
+    Computing it costs two small aggregate queries, so unchanged pages can
+    be answered with a 304 without fetching or serializing any vacations.
+    """
+    catalog = Vacation.objects.aggregate(updated=Max('updated_at'), total=Count('id'), likes=Sum('likes_count'))
+    last_like = Likes.objects.aggregate(last=Max('id'))['last']
+    version = f"{catalog['updated']}|{catalog['total']}|{catalog['likes']}|{last_like}|{request.get_full_path()}"
+    return quote_etag(hashlib.md5(version.encode(), usedforsecurity=False).hexdigest())
+
+
+class VacationCursorPagination(CursorPagination):
+    ordering = ('start_date', 'id')
+    page_size = 24
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class VacationListAPIView(ListAPIView):
+    """
+    Read-only, cursor paginated list of vacations.
+
+    Supports the filters of VacationFilterSerializer as query string
+    parameters and conditional GET through the ETag and If-None-Match
+    headers.
+    """
+    serializer_class = VacationSerializer
+    pagination_class = VacationCursorPagination
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self) -> QuerySet:
+        """
+        Return the vacations matching the query string filters, with their
+        country joined in. Like counts come from the likes_count column.
+        """
+        filters = VacationFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        return Vacation.objects.select_related('country').filter_by(**filters.validated_data)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Return a 304 response if the client's cached copy is still current,
+        otherwise the requested page with its ETag.
+        """
+        etag = catalog_etag(request)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().list(request, *args, **kwargs)
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
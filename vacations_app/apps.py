@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class VacationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vacations_app'
+
+    def ready(self):
+        """
+        Keep the vacations' like counters right when a user is deleted (see
+        uncount_deleted_user_likes).
+        """
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import pre_delete
+
+        from .models import uncount_deleted_user_likes
+
+        pre_delete.connect(uncount_deleted_user_likes, sender=get_user_model(), dispatch_uid='uncount_deleted_user_likes')
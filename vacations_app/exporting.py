@@ -0,0 +1,100 @@
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from typing import AsyncIterator, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+
+from vacations_app.models import Vacation
+
+# Columns of an export file. The first six match the columns read by the
+# import_vacations command, so an export can be imported elsewhere.
+EXPORT_FIELDS = (
+    'id', 'country', 'description', 'start_date', 'end_date', 'price', 'image',
+    'likes_count', 'updated_at', 'likes_updated_at',
+)
+
+# Number of rows fetched from the database cursor at a time.
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """
+    A file-like object that returns what is written to it, so csv.writer
+    can format one row at a time for a streaming response.
+    """
+    def write(self, value: str) -> str:
+        return value
+
+
+def export_queryset(since: Optional[datetime] = None) -> QuerySet:
+    """
+    Return the rows of the export as tuples in EXPORT_FIELDS order.
+
+    The country name is joined in the same query and the like counts come
+    from the likes_count column, so the export never counts Likes rows. With
+    ``since``, only the vacations edited or liked or unliked after that time
+    are returned. Deleted vacations are not reported.
+    """
+    queryset = Vacation.objects.order_by('id')
+    if since is not None:
+        queryset = queryset.filter(Q(updated_at__gt=since) | Q(likes_updated_at__gt=since))
+    return queryset.values_list(
+        'id', 'country__country_name', 'description', 'start_date', 'end_date', 'price', 'image',
+        'likes_count', 'updated_at', 'likes_updated_at',
+    )
+
+
+def stream_csv(queryset: QuerySet) -> Iterator[str]:
+    """
+    Yield the export as CSV lines, starting with a header line.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield writer.writerow(row)
+
+
+def stream_jsonl(queryset: QuerySet) -> Iterator[str]:
+    """
+    Yield the export as JSON Lines, one object per vacation.
+    """
+    for row in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield json.dumps(dict(zip(EXPORT_FIELDS, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+async def aexport_rows(queryset: QuerySet) -> AsyncIterator[tuple]:
+    """
+    Yield the rows of ``queryset`` to async code, fetching EXPORT_CHUNK_SIZE
+    rows at a time in a thread.
+
+    QuerySet.aiterator() cannot be used: it runs a values_list() query on
+    the event loop. Every chunk is fetched in the same thread, which holds
+    the database cursor.
+    """
+    rows = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    fetch = sync_to_async(lambda: list(islice(rows, EXPORT_CHUNK_SIZE)), thread_sensitive=True)
+    while chunk := await fetch():
+        for row in chunk:
+            yield row
+
+
+async def astream_csv(queryset: QuerySet) -> AsyncIterator[str]:
+    """
+    Asynchronous version of stream_csv(), for responses served over ASGI.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    async for row in aexport_rows(queryset):
+        yield writer.writerow(row)
+
+
+async def astream_jsonl(queryset: QuerySet) -> AsyncIterator[str]:
+    """
+    Asynchronous version of stream_jsonl(), for responses served over ASGI.
+    """
+    async for row in aexport_rows(queryset):
+        yield json.dumps(dict(zip(EXPORT_FIELDS, row)), cls=DjangoJSONEncoder) + '\n'
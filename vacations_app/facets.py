@@ -0,0 +1,69 @@
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import Case, CharField, Count, Q, QuerySet, Value, When
+
+# Price bands offered as a filter on the home page, mapped to their label
+# and bounds. The lower bound is inclusive and the upper bound exclusive.
+PRICE_BANDS = {
+    'under-1000': ('Under $1,000', None, Decimal('1000')),
+    '1000-2500': ('$1,000 – $2,500', Decimal('1000'), Decimal('2500')),
+    '2500-5000': ('$2,500 – $5,000', Decimal('2500'), Decimal('5000')),
+    '5000-up': ('$5,000 and up', Decimal('5000'), None),
+}
+
+
+def price_band_filter(band: str) -> Q:
+    """
+    Return the filter selecting the vacations in a price band.
+    """
+    _, low, high = PRICE_BANDS[band]
+    condition = Q()
+    if low is not None:
+        condition &= Q(price__gte=low)
+    if high is not None:
+        condition &= Q(price__lt=high)
+    return condition
+
+
+def facet_rows(queryset: QuerySet) -> QuerySet:
+    """
+    Return the number of vacations per country and price band as one
+    grouped query over ``queryset``, which should have every filter applied
+    except the country and price band ones.
+
+    Each row is a dict with country_id, country__country_name, band and
+    total. build_facets() turns the rows into the counts of both facets.
+    """
+    band = Case(*[When(price_band_filter(key), then=Value(key)) for key in PRICE_BANDS], output_field=CharField())
+    return (
+        queryset.order_by().annotate(band=band)
+        .values('country_id', 'country__country_name', 'band')
+        .annotate(total=Count('id'))
+    )
+
+
+def build_facets(rows: Iterable[Dict[str, Any]], country: Optional[int], band: Optional[str]) -> Tuple[List[tuple], List[tuple]]:
+    """
+    Return the country and price band options with their counts.
+
+    Each facet counts the vacations matching every filter except its own,
+    so picking a country still shows how many vacations the other countries
+    have. Countries are (id, name, count, selected) tuples sorted by name,
+    and price bands (key, label, count, selected) tuples in PRICE_BANDS
+    order.
+    """
+    countries = {}
+    bands = dict.fromkeys(PRICE_BANDS, 0)
+    for row in rows:
+        if band is None or row['band'] == band:
+            name, total = countries.get(row['country_id'], (row['country__country_name'], 0))
+            countries[row['country_id']] = (name, total + row['total'])
+        if country is None or row['country_id'] == country:
+            bands[row['band']] += row['total']
+    country_options = sorted(
+        ((country_id, name, total, country_id == country) for country_id, (name, total) in countries.items()),
+        key=lambda option: option[1].lower(),
+    )
+    band_options = [(key, PRICE_BANDS[key][0], total, key == band) for key, total in bands.items()]
+    return country_options, band_options
@@ -3,6 +3,7 @@ from django import forms
 from django.core.validators import MinValueValidator, MaxValueValidator, MinLengthValidator
 from django.core.exceptions import ValidationError
 from datetime import date
+from .facets import PRICE_BANDS
 
         
         
@@ -30,6 +31,25 @@ class UpdateVacationForm(VacationForm):
     start_date = forms.DateField(widget = forms.DateInput(attrs={"type": 'date'}), required=True, label='Start Date')
     end_date = forms.DateField(widget = forms.DateInput(attrs={"type": 'date'}), required=True, label='End Date')
     
+class VacationFilterForm(forms.Form):
+    """
+    The filters of the home feed, read from the query string. Invalid values
+    are ignored rather than reported, since the form is only a set of links.
+    """
+    # Bounded by the range of the id column, which the database refuses to
+    # compare with larger numbers.
+    country = forms.IntegerField(required=False, label='Country', min_value=1, max_value=2**63 - 1)
+    price = forms.ChoiceField(choices=[(key, band[0]) for key, band in PRICE_BANDS.items()], required=False, label='Price')
+    start_after = forms.DateField(required=False, label='Leaving from', widget=forms.DateInput(attrs={'type': 'date'}))
+    end_before = forms.DateField(required=False, label='Back by', widget=forms.DateInput(attrs={'type': 'date'}))
+
+    def filters(self) -> dict:
+        """
+        Return the valid filters that were given.
+        """
+        self.is_valid()
+        return {name: value for name, value in getattr(self, 'cleaned_data', {}).items() if value not in (None, '')}
+
 class CountryForm(forms.ModelForm):
     class Meta:
         model = Country
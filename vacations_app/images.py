@@ -0,0 +1,104 @@
+import io
+import posixpath
+from typing import Dict
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+# Widths, in pixels, of the resized copies made for every vacation image.
+DERIVATIVE_WIDTHS = (320, 640, 960, 1280)
+
+# Formats of the resized copies, mapped to their Pillow format and save options.
+DERIVATIVE_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# The value of the sizes attribute for the cards on the home page, which
+# are laid out three to a row on wide screens.
+CARD_SIZES = '(max-width: 768px) 100vw, 33vw'
+
+
+def derivative_name(image_name: str, width: int, extension: str) -> str:
+    """
+    Return the storage name of a resized copy of ``image_name``, kept in a
+    derivatives folder next to the original.
+    """
+    folder, filename = posixpath.split(image_name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(folder, 'derivatives', f'{stem}-{width}w.{extension}')
+
+
+def build_derivatives(image) -> Dict[str, Dict[str, str]]:
+    """
+    Write resized WebP and JPEG copies of an image field file to its storage.
+
+    Images are never scaled up (see resized_copies). Returns a mapping of format to {width: storage name}.
+    """
+    image.open('rb')
+    try:
+        with Image.open(image) as original:
+            original = ImageOps.exif_transpose(original).convert('RGB')
+    finally:
+        image.close()
+    variants = {extension: {} for extension in DERIVATIVE_FORMATS}
+    for width, resized in resized_copies(original, DERIVATIVE_WIDTHS):
+        for extension in DERIVATIVE_FORMATS:
+            name = derivative_name(image.name, width, extension)
+            if image.storage.exists(name):
+                image.storage.delete(name)
+            variants[extension][str(width)] = image.storage.save(name, ContentFile(encode_image(resized, extension)))
+    return variants
+
+
+def resized_copies(original: Image.Image, widths):
+    """
+    Yield (width, image) pairs of ``original`` scaled down to each of the
+    given widths that is smaller than it, or the original alone if it is
+    narrower than all of them.
+    """
+    for width in [width for width in widths if width < original.width] or [original.width]:
+        height = round(original.height * width / original.width)
+        yield width, original.resize((width, height), Image.LANCZOS)
+
+
+def encode_image(image: Image.Image, extension: str) -> bytes:
+    """
+    Encode an RGB image in one of the DERIVATIVE_FORMATS and return the bytes.
+    """
+    image_format, options = DERIVATIVE_FORMATS[extension]
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+def delete_derivatives(storage, variants: Dict[str, Dict[str, str]]) -> None:
+    """
+    Delete the resized copies listed in ``variants`` from ``storage``.
+    """
+    for names in variants.values():
+        for name in names.values():
+            storage.delete(name)
+
+
+def generate_derivatives(vacation) -> None:
+    """
+    Replace the resized copies of a vacation's image and store their names
+    on the vacation.
+
+    The vacation row is updated directly rather than through save(), so the
+    model validation is not run again, but updated_at is bumped so the
+    vacation's cached card picks up the new srcset.
+    """
+    storage = vacation.image.storage
+    old_variants = vacation.image_variants
+    variants = build_derivatives(vacation.image) if vacation.image else {}
+    stale = {
+        extension: {width: name for width, name in names.items() if name not in variants.get(extension, {}).values()}
+        for extension, names in old_variants.items()
+    }
+    delete_derivatives(storage, stale)
+    vacation.image_variants = variants
+    vacation.updated_at = timezone.now()
+    type(vacation).objects.filter(pk=vacation.pk).update(image_variants=variants, updated_at=vacation.updated_at)
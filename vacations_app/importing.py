@@ -0,0 +1,189 @@
+import csv
+import json
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
+from vacations_app.models import Country, Vacation
+from vacations_app.seeding import batched
+
+# Columns of an import file. 'country' is a country name or id and 'image' a
+# path relative to MEDIA_ROOT, such as 'vacation_images/rome.jpg'.
+IMPORT_FIELDS = ('country', 'description', 'start_date', 'end_date', 'price', 'image')
+
+
+@dataclass
+class RejectedRow:
+    line: int
+    error: str
+    row: Dict[str, str]
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    rejected: int = 0
+
+
+def read_rows(stream, file_format: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Yield (line number, row) pairs from a CSV file with a header row or a
+    JSON Lines file, one row at a time so files of any size can be read.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if not isinstance(row, dict):
+            row = {'__invalid__': line.rstrip('\n')}
+        yield line_number, row
+
+
+def parse_row(row: Dict[str, str], today: date) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    Parse and validate one row without touching the database.
+
+    The checks mirror Vacation.clean() for new vacations. Returns the parsed
+    values and None, or None and the error message.
+    """
+    if '__invalid__' in row:
+        return None, "Line is not a JSON object."
+    # A JSON Lines price of 0 is a value, not a missing one.
+    values = {field: '' if row.get(field) is None else str(row.get(field)).strip() for field in IMPORT_FIELDS}
+    missing = [field for field in IMPORT_FIELDS if not values[field]]
+    if missing:
+        return None, f"Missing {', '.join(missing)}."
+    try:
+        start_date = parse_date(values['start_date'])
+        end_date = parse_date(values['end_date'])
+    except ValueError:
+        start_date = end_date = None
+    if start_date is None or end_date is None:
+        return None, "Dates must be in YYYY-MM-DD format."
+    try:
+        price = Decimal(values['price'])
+    except InvalidOperation:
+        return None, "Price must be a number."
+    # NaN cannot even be compared with a number.
+    if not price.is_finite():
+        return None, "Price must be a number."
+    if start_date <= today:
+        return None, "Start date must be in the future."
+    if end_date <= start_date:
+        return None, "End date must be after start date."
+    if price < 0:
+        return None, "Price must be greater than 0"
+    if price > 10000:
+        return None, "Price must be less than 10000"
+    if price.as_tuple().exponent < -2:
+        return None, "Price can have at most 2 decimal places."
+    if len(values['description']) < 10:
+        return None, "Description must be at least 10 characters long."
+    values.update(start_date=start_date, end_date=end_date, price=price)
+    return values, None
+
+
+def import_batch(rows: List[Tuple[int, Dict[str, str]]], seen: Set[tuple], today: date) -> Tuple[int, List[RejectedRow]]:
+    """
+    Validate and insert one batch of rows.
+
+    Rather than running Vacation.full_clean() per row, which costs at least
+    three queries each, the whole batch is checked with one query resolving
+    its countries and one probing for existing (country, start_date,
+    end_date) combinations. The valid rows are then inserted with a single
+    bulk_create, followed on PostgreSQL by one update computing their search
+    vectors. ``seen`` holds the combinations imported so far, to catch
+    duplicates within the file.
+    """
+    rejected = []
+    parsed = []
+    for line, row in rows:
+        values, error = parse_row(row, today)
+        if error:
+            rejected.append(RejectedRow(line, error, row))
+        else:
+            parsed.append((line, row, values))
+
+    names = {values['country'] for _, _, values in parsed}
+    ids = {int(name) for name in names if name.isdigit()}
+    countries = {}
+    for country_id, country_name in Country.objects.filter(Q(country_name__in=names) | Q(id__in=ids)).values_list('id', 'country_name'):
+        countries[country_name] = country_id
+        countries[str(country_id)] = country_id
+
+    resolved = []
+    for line, row, values in parsed:
+        country_id = countries.get(values['country'])
+        if country_id is None:
+            rejected.append(RejectedRow(line, "Country does not exist.", row))
+        else:
+            resolved.append((line, row, values, (country_id, values['start_date'], values['end_date'])))
+
+    existing = set()
+    if resolved:
+        existing = set(
+            Vacation.objects.filter(
+                country_id__in={key[0] for *_, key in resolved},
+                start_date__in={key[1] for *_, key in resolved},
+                end_date__in={key[2] for *_, key in resolved},
+            ).values_list('country_id', 'start_date', 'end_date')
+        )
+
+    vacations = []
+    batch_rows = []
+    for line, row, values, key in resolved:
+        if key in existing or key in seen:
+            rejected.append(RejectedRow(line, "Vacation with this Country, Start date and End date already exists.", row))
+            continue
+        seen.add(key)
+        batch_rows.append((line, row))
+        vacations.append(Vacation(
+            country_id=key[0],
+            description=values['description'],
+            start_date=values['start_date'],
+            end_date=values['end_date'],
+            price=values['price'],
+            image=values['image'],
+        ))
+
+    if vacations:
+        try:
+            with transaction.atomic():
+                Vacation.objects.bulk_create(vacations)
+                Vacation.objects.filter(pk__in=[vacation.pk for vacation in vacations]).update_search_vectors()
+        except IntegrityError:
+            # Another writer created one of these vacations since the probe.
+            rejected.extend(RejectedRow(line, "Conflicts with a vacation created during the import.", row) for line, row in batch_rows)
+            vacations = []
+    rejected.sort(key=lambda rejection: rejection.line)
+    return len(vacations), rejected
+
+
+def import_vacations(rows: Iterable[Tuple[int, Dict[str, str]]], batch_size: int, on_rejected) -> ImportResult:
+    """
+    Import rows in batches of ``batch_size``, calling ``on_rejected`` with
+    every RejectedRow, and return the totals.
+    """
+    result = ImportResult()
+    seen = set()
+    today = date.today()
+    for batch in batched(rows, batch_size):
+        created, rejected = import_batch(batch, seen, today)
+        result.created += created
+        result.rejected += len(rejected)
+        for rejection in rejected:
+            on_rejected(rejection)
+    return result
@@ -0,0 +1,118 @@
+"""
+Database-backed queue of image processing jobs.
+
+Saving a vacation with a new image only records an ImageJob once the
+transaction commits; the resized copies are made later by the
+process_image_jobs worker, so the admin's request never waits for Pillow.
+Until they are ready the vacation has no image_variants and its card shows
+the original image.
+
+Workers claim a job with a conditional UPDATE from pending to running, so
+several of them can share the table without a broker or row locks. A
+failed job is retried IMAGE_JOB_MAX_ATTEMPTS times with a growing delay,
+and a job left running for IMAGE_JOB_TIMEOUT seconds, by a worker that
+died, is handed out again.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .images import delete_derivatives, generate_derivatives
+from .models import ImageJob, Vacation
+
+logger = logging.getLogger('vacations_app.jobs')
+
+
+def enqueue_image_job(vacation: Vacation) -> None:
+    """
+    Queue the generation of the resized copies of ``vacation``'s image once
+    the current transaction commits, unless a job for it is already pending.
+    """
+    def enqueue():
+        if not ImageJob.objects.filter(vacation_id=vacation.pk, status=ImageJob.Status.PENDING).exists():
+            ImageJob.objects.create(vacation_id=vacation.pk)
+
+    transaction.on_commit(enqueue)
+
+
+def discard_variants(vacation: Vacation) -> None:
+    """
+    Forget the resized copies of ``vacation``'s previous image before it is
+    saved with a new one, so its card shows the new original until its job
+    has run, and delete their files once the save commits.
+    """
+    variants: Dict[str, Dict[str, str]] = vacation.image_variants
+    vacation.image_variants = {}
+    if variants:
+        storage = vacation.image.storage
+        transaction.on_commit(lambda: delete_derivatives(storage, variants))
+
+
+def claim_next_job() -> Optional[ImageJob]:
+    """
+    Mark the oldest pending job that is due as running and return it, or
+    return None if there is none. A job claimed by another worker between
+    reading and updating it is skipped.
+    """
+    now = timezone.now()
+    candidates = (
+        ImageJob.objects.filter(status=ImageJob.Status.PENDING, run_after__lte=now)
+        .order_by('run_after', 'id').values_list('id', flat=True)[:10]
+    )
+    for job_id in candidates:
+        claimed = ImageJob.objects.filter(id=job_id, status=ImageJob.Status.PENDING).update(
+            status=ImageJob.Status.RUNNING, started_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            # The vacation, and its jobs with it, may be deleted meanwhile.
+            job = ImageJob.objects.select_related('vacation').filter(id=job_id).first()
+            if job:
+                return job
+    return None
+
+
+def run_job(job: ImageJob) -> bool:
+    """
+    Generate the resized copies of a claimed job's vacation and record the
+    outcome on the job. Return whether it succeeded.
+
+    A failed attempt is retried after 1, 4, 9... minutes until the job has
+    been tried IMAGE_JOB_MAX_ATTEMPTS times; then it is marked failed, with
+    the error shown in the admin.
+    """
+    try:
+        generate_derivatives(job.vacation)
+    except Exception as error:
+        logger.exception("Image job %s for vacation %s failed.", job.pk, job.vacation_id)
+        job.last_error = f"{type(error).__name__}: {error}"
+        if job.attempts >= settings.IMAGE_JOB_MAX_ATTEMPTS:
+            job.status = ImageJob.Status.FAILED
+            job.finished_at = timezone.now()
+        else:
+            job.status = ImageJob.Status.PENDING
+            job.run_after = timezone.now() + timedelta(minutes=job.attempts ** 2)
+        job.save(update_fields=['status', 'last_error', 'run_after', 'finished_at'])
+        return False
+    job.status = ImageJob.Status.DONE
+    job.last_error = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'last_error', 'finished_at'])
+    return True
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Put back in the queue the jobs that have been running for more than
+    IMAGE_JOB_TIMEOUT seconds, whose worker must have stopped, and return
+    how many there were.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.IMAGE_JOB_TIMEOUT)
+    return ImageJob.objects.filter(status=ImageJob.Status.RUNNING, started_at__lt=cutoff).update(
+        status=ImageJob.Status.PENDING, run_after=timezone.now(),
+    )
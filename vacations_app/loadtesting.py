@@ -0,0 +1,237 @@
+import asyncio
+import http.cookiejar
+import math
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+
+
+@dataclass
+class LoadResult:
+    requests: int = 0
+    errors: int = 0
+    duration: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """
+        Return the number of successful requests per second.
+        """
+        return len(self.latencies) / self.duration if self.duration else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Return the throughput, error count and p50/p95/p99 latency in
+        milliseconds.
+        """
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'throughput': round(self.throughput, 1),
+            'p50': round(percentile(self.latencies, 50), 2),
+            'p95': round(percentile(self.latencies, 95), 2),
+            'p99': round(percentile(self.latencies, 99), 2),
+        }
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """
+    Return the ``percent`` percentile of ``values`` by the nearest rank
+    method, or 0 if there are none.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+async def slow_request(url: str, cookies: Optional[Dict[str, str]] = None, send_delay: float = 0.0) -> int:
+    """
+    Send a GET request to ``url`` over a new HTTP/1.1 connection and return
+    the response status. Raises OSError if the connection fails or closes
+    without a valid status line.
+
+    When ``send_delay`` is set the request head is sent one line at a time,
+    waiting that many seconds between lines, like a client on a slow
+    network. A server that gives every connection its own worker thread
+    keeps that thread busy for the whole time.
+    """
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    lines = [f'GET {path} HTTP/1.1', f'Host: {parts.netloc}', 'Connection: close']
+    if cookies:
+        lines.append('Cookie: ' + '; '.join(f'{name}={value}' for name, value in cookies.items()))
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    try:
+        for line in lines + ['']:
+            writer.write(f'{line}\r\n'.encode())
+            await writer.drain()
+            if send_delay:
+                await asyncio.sleep(send_delay)
+        status_line = await reader.readline()
+        await reader.read()
+    finally:
+        writer.close()
+    # A server dropping the connection sends no status line at all.
+    parts = status_line.split()
+    if len(parts) < 2 or not parts[1].isdigit():
+        raise ConnectionError(f"No HTTP response, got {status_line!r}.")
+    return int(parts[1])
+
+
+async def run_load(url: str, total: int, concurrency: int, cookies: Optional[Dict[str, str]] = None,
+                   send_delay: float = 0.0) -> LoadResult:
+    """
+    Send ``total`` requests to ``url`` from ``concurrency`` clients at once
+    and return their latencies. Failed requests and responses other than
+    200 are counted as errors.
+    """
+    result = LoadResult()
+    remaining = iter(range(total))
+
+    async def client():
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                status = await slow_request(url, cookies, send_delay)
+            except OSError:
+                status = None
+            result.requests += 1
+            if status == 200:
+                result.latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                result.errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    result.duration = time.perf_counter() - started
+    return result
+
+
+class ClientSession:
+    """
+    A user of the app driven in-process through Django's test client, so no
+    server is needed. Server errors are returned as 500 responses rather
+    than raised.
+    """
+
+    def __init__(self) -> None:
+        self.client = Client(raise_request_exception=False)
+
+    def request(self, method: str, path: str, data: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Send a GET or POST request and return the response status.
+        """
+        if method == 'POST':
+            return self.client.post(path, data or {}).status_code
+        return self.client.get(path, data).status_code
+
+
+class NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        """
+        Return the redirect response itself instead of following it.
+        """
+        return None
+
+
+class HttpSession:
+    """
+    A user of the app running behind a server at ``base_url``. Cookies are
+    kept between requests, redirects are not followed and POST requests
+    carry the CSRF token from the cookie, like the page scripts do.
+    """
+
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url.rstrip('/')
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies), NoRedirectHandler)
+
+    def request(self, method: str, path: str, data: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Send a GET or POST request and return the response status.
+        """
+        url = self.base_url + path
+        body = None
+        headers = {}
+        if method == 'POST':
+            body = urlencode(data or {}).encode()
+            headers['X-CSRFToken'] = next((cookie.value for cookie in self.cookies if cookie.name == settings.CSRF_COOKIE_NAME), '')
+        elif data:
+            url += '?' + urlencode(data)
+        try:
+            with self.opener.open(urllib.request.Request(url, body, headers, method=method), timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+
+
+def run_sessions(sessions: Sequence[Any], task: Callable[[Any], bool], total: int) -> LoadResult:
+    """
+    Call ``task`` ``total`` times, spread over the ``sessions`` with one
+    thread per session, and return the latencies of the calls. ``task``
+    sends a request with the session and returns whether it succeeded;
+    calls that fail or raise OSError are counted as errors.
+    """
+    result = LoadResult()
+    lock = threading.Lock()
+    remaining = total
+
+    def worker(session):
+        nonlocal remaining
+        try:
+            while True:
+                with lock:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                started = time.perf_counter()
+                try:
+                    succeeded = task(session)
+                except OSError:
+                    succeeded = False
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    result.requests += 1
+                    if succeeded:
+                        result.latencies.append(elapsed)
+                    else:
+                        result.errors += 1
+        finally:
+            # Each thread has its own database connections.
+            connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(sessions)) as pool:
+        list(pool.map(worker, sessions))
+    result.duration = time.perf_counter() - started
+    return result
+
+
+def current_commit() -> Optional[str]:
+    """
+    Return the abbreviated git commit of the project, or None if it is not
+    a git checkout.
+    """
+    try:
+        output = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
@@ -0,0 +1,72 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request cost of getting a database connection with and without connection reuse."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help="Number of simulated requests per mode.")
+
+    def handle(self, *args, **options):
+        """
+        Simulate requests that each run one small query, sending the
+        request_started and request_finished signals around it just like
+        the request handler, so Django opens, checks, reuses or closes the
+        connection exactly as it would while serving pages.
+
+        Without a pool, each run compares a new connection per request
+        (CONN_MAX_AGE = 0) with a persistent connection with health checks.
+        With the psycopg pool configured (see settings_production), the
+        pooled connections are measured instead. Run the command with each
+        settings module to compare them.
+        """
+        if 'pool' in connection.settings_dict.get('OPTIONS', {}):
+            modes = [('connection pool', {})]
+        else:
+            modes = [
+                ('new connection per request', {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False}),
+                ('persistent connection', {'CONN_MAX_AGE': None, 'CONN_HEALTH_CHECKS': True}),
+            ]
+        self.stdout.write(f"{'mode':<30}{'connects':>10}{'median ms':>12}{'p99 ms':>10}")
+        for name, overrides in modes:
+            connects, timings = self.measure(overrides, options['requests'])
+            timings.sort()
+            p99 = timings[max(int(len(timings) * 0.99) - 1, 0)]
+            self.stdout.write(f"{name:<30}{connects:>10}{statistics.median(timings):>12.3f}{p99:>10.3f}")
+
+    def measure(self, overrides, requests):
+        """
+        Run ``requests`` simulated requests with the connection settings
+        changed by ``overrides`` and return the number of connections opened
+        and the time of each request in milliseconds.
+        """
+        original = {key: connection.settings_dict.get(key) for key in overrides}
+        connection.settings_dict.update(overrides)
+        connection.close()
+        connects = []
+
+        def count(sender, **kwargs):
+            connects.append(sender)
+
+        connection_created.connect(count)
+        timings = []
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                request_started.send(sender=self.__class__)
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                request_finished.send(sender=self.__class__)
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            connection_created.disconnect(count)
+            connection.close()
+            connection.settings_dict.update(original)
+        return len(connects), timings
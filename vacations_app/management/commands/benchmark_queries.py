@@ -0,0 +1,86 @@
+import random
+import statistics
+import time
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from vacations_app.models import Likes, Vacation
+from vacations_app.pagination import keyset_filter
+from vacations_app.seeding import seed_countries, seed_likes, seed_users, seed_vacations
+
+
+class Command(BaseCommand):
+    help = "Print EXPLAIN plans and timings of the app's hot queries on a large generated catalog."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vacations', type=int, default=10000, help="Number of vacations to generate.")
+        parser.add_argument('--likes', type=int, default=1000000, help="Number of likes to generate.")
+        parser.add_argument('--users', type=int, default=20000, help="Number of users to generate.")
+        parser.add_argument('--countries', type=int, default=150, help="Number of countries to generate.")
+        parser.add_argument('--repeat', type=int, default=20, help="Number of timed runs of each query.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for the generated data.")
+        parser.add_argument('--keep', action='store_true', help="Keep the generated data instead of rolling it back.")
+
+    def handle(self, *args, **options):
+        """
+        Generate the data inside a transaction, refresh the planner
+        statistics, then run every hot query --repeat times, printing its
+        plan and its minimum and median time. Unless --keep is given the
+        transaction is rolled back, leaving the database untouched.
+        """
+        with transaction.atomic():
+            self.seed(options)
+            for name, queryset in self.hot_queries():
+                self.report(name, queryset, options['repeat'])
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+        country_ids = seed_countries(options['countries'], prefix='Benchmark country')
+        vacation_ids = seed_vacations(options['vacations'], country_ids, rng)
+        user_ids = seed_users(options['users'], prefix='benchmark')
+        likes = seed_likes(options['likes'], user_ids, vacation_ids, rng)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        self.stdout.write(
+            f"Generated {len(vacation_ids)} vacations, {len(user_ids)} users and {likes} likes "
+            f"in {time.perf_counter() - started:.1f}s.\n"
+        )
+
+    def hot_queries(self):
+        """
+        Yield (name, queryset) pairs for the queries run on every page view
+        or click, with the parameters a busy user would send.
+        """
+        user = User.objects.filter(likes__isnull=False).order_by('-id').first()
+        vacation = Vacation.objects.order_by('-likes_count').first()
+        feed = Vacation.objects.for_feed(user).order_by('start_date', 'id')
+        middle = Vacation.objects.order_by('start_date', 'id')[Vacation.objects.count() // 2]
+        yield 'home feed, first page', feed[:25]
+        yield 'home feed, deep page', feed.filter(keyset_filter(('start_date', 'id'), (middle.start_date, middle.id)))[:25]
+        popular = Vacation.objects.for_feed(user).order_by('-likes_count', 'id')
+        yield 'home feed, most liked first', popular[:25]
+        yield 'search, best match first', feed.search('country 3').order_by('-rank', 'id')[:25]
+        yield 'upcoming vacations', feed.filter(start_date__gte=date.today())[:25]
+        yield 'sign up email check', User.objects.filter(email=user.email)
+        yield 'liked vacations of a user', Likes.objects.filter(user=user).values('vacation_id')
+        yield 'has user liked vacation', Likes.objects.filter(user=user, vacation=vacation)
+        yield 'likes of a vacation', Likes.objects.filter(vacation=vacation).values('user_id')
+
+    def report(self, name, queryset, repeat):
+        options = {'analyze': True} if connection.vendor == 'postgresql' else {}
+        plan = queryset.explain(**options)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        self.stdout.write(plan)
+        self.stdout.write(f"min {min(timings):.2f} ms, median {statistics.median(timings):.2f} ms\n")
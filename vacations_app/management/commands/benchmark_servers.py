@@ -0,0 +1,65 @@
+import asyncio
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from vacations_app.loadtesting import run_load
+
+
+class Command(BaseCommand):
+    help = "Compare the throughput and latency of the home feed served over WSGI and ASGI with many slow clients."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', help="Base URL of the app served by a WSGI server, e.g. http://127.0.0.1:8000.")
+        parser.add_argument('--asgi-url', help="Base URL of the app served by an ASGI server, e.g. http://127.0.0.1:8001.")
+        parser.add_argument('--path', default='/', help="Path to request.")
+        parser.add_argument('--requests', type=int, default=2000, help="Total number of requests per server.")
+        parser.add_argument('--concurrency', type=int, default=200, help="Number of clients sending requests at once.")
+        parser.add_argument('--send-delay', type=float, default=0.05, help="Seconds each client waits between the lines of its request.")
+        parser.add_argument('--username', help="Existing user to log in as. By default a temporary user is created and deleted afterwards.")
+
+    def handle(self, *args, **options):
+        """
+        Log in a user to get a session cookie, then load each given server
+        in turn with --concurrency clients that send their requests slowly
+        and print the requests per second and latency percentiles. The
+        session, and the temporary user if one was created, are deleted at
+        the end.
+
+        Both servers must use the same database as this command, for example:
+
+            gunicorn vacations_project.wsgi -w 4 -b 127.0.0.1:8000
+            uvicorn vacations_project.asgi:application --workers 4 --port 8001
+        """
+        servers = [(name, options[f'{name}_url']) for name in ('wsgi', 'asgi') if options[f'{name}_url']]
+        if not servers:
+            raise CommandError("Give --wsgi-url, --asgi-url or both.")
+        if options['username']:
+            try:
+                user = User.objects.get(username=options['username'])
+            except User.DoesNotExist:
+                raise CommandError(f"There is no user {options['username']}.")
+        else:
+            user = User.objects.create_user(username=f'benchmark-{uuid.uuid4().hex}@example.com')
+        client = Client()
+        try:
+            client.force_login(user)
+            cookies = {settings.SESSION_COOKIE_NAME: client.cookies[settings.SESSION_COOKIE_NAME].value}
+            self.stdout.write(f"{'server':<8}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+            for name, base_url in servers:
+                result = asyncio.run(run_load(
+                    base_url.rstrip('/') + options['path'], options['requests'], options['concurrency'],
+                    cookies, options['send_delay'],
+                ))
+                summary = result.summary()
+                self.stdout.write(
+                    f"{name:<8}{summary['requests']:>10}{summary['errors']:>8}{summary['throughput']:>10}"
+                    f"{summary['p50']:>10}{summary['p95']:>10}{summary['p99']:>10}"
+                )
+        finally:
+            client.logout()
+            if not options['username']:
+                user.delete()
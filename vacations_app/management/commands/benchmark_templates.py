@@ -0,0 +1,82 @@
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.test import RequestFactory
+from django.utils import timezone
+
+from vacations_app.images import CARD_SIZES
+from vacations_app.models import Country, Vacation
+from vacations_app.seeding import SAMPLE_IMAGES
+
+
+class Command(BaseCommand):
+    help = "Measure how long the home page takes to render with each template engine."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, nargs='+', default=[100, 1000, 10000], help="Numbers of vacation cards to render.")
+        parser.add_argument('--repeat', type=int, default=5, help="Number of timed renders of each page.")
+
+    def handle(self, *args, **options):
+        """
+        Render home.html with each configured engine for pages of --cards
+        in-memory vacations, so no query is run, and print the first render,
+        which fills the card cache, and the median of the following ones.
+
+        Each run gets vacations with a new updated_at, so their cards are
+        not cached yet, and the cards it cached are deleted afterwards.
+        Nothing else in the cache is touched.
+        """
+        request = RequestFactory().get('/')
+        request.user = User(id=1, username='benchmark@example.com', first_name='Benchmark')
+        names = [engine.name for engine in engines.all() if engine.name in ('django', 'jinja2')]
+        self.stdout.write(f"{'engine':<10}{'cards':>8}{'first ms':>12}{'median ms':>12}{'ms/card':>10}")
+        for count in options['cards']:
+            context = {
+                'next_cursor': 'benchmark',
+                'card_sizes': CARD_SIZES,
+                'today': date.today(),
+                'filters': {},
+                'country_options': [],
+                'price_options': [],
+            }
+            for name in names:
+                template = engines[name].get_template('home.html')
+                context['vacations'] = vacations = self.vacations(count)
+                timings = []
+                for _ in range(options['repeat'] + 1):
+                    started = time.perf_counter()
+                    template.render(context, request)
+                    timings.append((time.perf_counter() - started) * 1000)
+                median = statistics.median(timings[1:]) if len(timings) > 1 else timings[0]
+                cache.delete_many([vacation.card_cache_key() for vacation in vacations])
+                self.stdout.write(f"{name:<10}{count:>8}{timings[0]:>12.1f}{median:>12.1f}{median / count:>10.3f}")
+
+    def vacations(self, count):
+        """
+        Return ``count`` unsaved vacations annotated like the home feed.
+        """
+        countries = [Country(id=number, country_name=f'Country {number}') for number in range(1, 51)]
+        start = date.today() + timedelta(days=30)
+        now = timezone.now()
+        vacations = []
+        for number in range(count):
+            vacation = Vacation(
+                id=number + 1,
+                country=countries[number % len(countries)],
+                description=f'Benchmark vacation package number {number}',
+                start_date=start + timedelta(days=number % 365),
+                end_date=start + timedelta(days=number % 365 + 7),
+                price=Decimal('1000.00') + number % 9000,
+                image=SAMPLE_IMAGES[number % len(SAMPLE_IMAGES)],
+                likes_count=number % 50,
+                updated_at=now,
+            )
+            vacation.liked = number % 3 == 0
+            vacations.append(vacation)
+        return vacations
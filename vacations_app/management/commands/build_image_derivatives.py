@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from vacations_app.images import generate_derivatives
+from vacations_app.models import Vacation
+
+
+class Command(BaseCommand):
+    help = "Generate the resized WebP and JPEG copies of existing vacation images."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Regenerate the copies of images that already have them.")
+
+    def handle(self, *args, **options):
+        """
+        Generate the resized copies for every vacation with an image but no
+        copies yet, or for every vacation with an image if --force is given.
+
+        Vacations whose image file cannot be read are reported and skipped.
+        """
+        vacations = Vacation.objects.exclude(image='').exclude(image__isnull=True).order_by('pk')
+        if not options['force']:
+            vacations = vacations.filter(image_variants={})
+        built = failed = 0
+        for vacation in vacations.iterator(chunk_size=100):
+            try:
+                generate_derivatives(vacation)
+            except OSError as error:
+                failed += 1
+                self.stderr.write(f"Vacation {vacation.pk}: could not process {vacation.image.name}: {error}")
+                continue
+            built += 1
+        self.stdout.write(self.style.SUCCESS(f"Generated image derivatives for {built} vacations, {failed} failed."))
@@ -0,0 +1,35 @@
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+from vacations_app.images import DERIVATIVE_FORMATS, encode_image, resized_copies
+
+
+class Command(BaseCommand):
+    help = "Write resized WebP and JPEG copies of the images listed in STATIC_IMAGE_VARIANTS."
+
+    def handle(self, *args, **options):
+        """
+        For every image in settings.STATIC_IMAGE_VARIANTS, write copies at
+        each configured width next to the original, named like
+        'vacation-bg-800w.webp'. The copies are source files: commit them and
+        reference them from the stylesheets, so collectstatic hashes and
+        compresses them like any other static file.
+        """
+        for name, widths in settings.STATIC_IMAGE_VARIANTS.items():
+            path = finders.find(name)
+            if path is None:
+                raise CommandError(f"Static image {name} was not found.")
+            stem = os.path.splitext(path)[0]
+            with Image.open(path) as original:
+                original = original.convert('RGB')
+                for width, resized in resized_copies(original, widths):
+                    for extension in DERIVATIVE_FORMATS:
+                        variant = f'{stem}-{width}w.{"jpg" if extension == "jpeg" else extension}'
+                        with open(variant, 'wb') as output:
+                            output.write(encode_image(resized, extension))
+                        self.stdout.write(f"Wrote {os.path.relpath(variant, settings.BASE_DIR)} ({os.path.getsize(variant) // 1024} KB)")
+        self.stdout.write(self.style.SUCCESS("Static image variants are up to date."))
@@ -0,0 +1,47 @@
+import csv
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vacations_app.importing import IMPORT_FIELDS, import_vacations, read_rows
+
+
+class Command(BaseCommand):
+    help = "Import vacations from a CSV or JSON Lines file, validating them in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help=f"File to import, '-' for standard input. Columns: {', '.join(IMPORT_FIELDS)}.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="File format, guessed from the extension by default.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Number of rows validated and inserted per batch.")
+        parser.add_argument('--errors', help="Write rejected rows to this CSV file instead of standard error.")
+
+    def handle(self, *args, **options):
+        """
+        Stream the file and import it batch by batch (see
+        vacations_app.importing). Rejected rows are written to the error
+        report with their line number and the reason they were rejected.
+        """
+        path = options['path']
+        file_format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        if path == '-' and not options['format']:
+            raise CommandError("--format is required when reading from standard input.")
+        try:
+            source = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+        except OSError as error:
+            raise CommandError(f"Cannot open {path}: {error}")
+        report_file = open(options['errors'], 'w', newline='', encoding='utf-8') if options['errors'] else None
+        report = csv.writer(report_file or self.stderr)
+        report.writerow(['line', 'error', 'row'])
+        try:
+            result = import_vacations(
+                read_rows(source, file_format),
+                options['batch_size'],
+                lambda rejection: report.writerow([rejection.line, rejection.error, json.dumps(rejection.row)]),
+            )
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if report_file:
+                report_file.close()
+        self.stdout.write(self.style.SUCCESS(f"Imported {result.created} vacations, rejected {result.rejected} rows."))
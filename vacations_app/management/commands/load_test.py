@@ -0,0 +1,140 @@
+import json
+import random
+from datetime import datetime, timezone
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from vacations_app.loadtesting import ClientSession, HttpSession, current_commit, run_sessions
+from vacations_app.models import Vacation
+
+SCENARIOS = ('home', 'like', 'login')
+
+
+class Command(BaseCommand):
+    help = "Load the home feed, like toggling and login with concurrent users and report throughput and latency percentiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help="Base URL of a running server, e.g. http://127.0.0.1:8000. By default requests go through the test client in-process.")
+        parser.add_argument('--scenario', nargs='+', choices=SCENARIOS, default=list(SCENARIOS), help="Scenarios to run.")
+        parser.add_argument('--requests', type=int, default=500, help="Total number of requests per scenario.")
+        parser.add_argument('--concurrency', type=int, default=10, help="Number of users sending requests at once.")
+        parser.add_argument('--prefix', default='loadtest', help="Username prefix of the users to log in as (see seed_scale).")
+        parser.add_argument('--password', default='LoadTest123!', help="Password of those users.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for the vacations liked.")
+        parser.add_argument('--throttle', action='store_true', help="Keep login throttling on for in-process runs, where every user shares one IP address.")
+        parser.add_argument('--save', metavar='FILE', help="Write the results to FILE as a baseline for later runs.")
+        parser.add_argument('--compare', metavar='FILE', help="Compare the results with a baseline written by --save.")
+
+    def handle(self, *args, **options):
+        """
+        Log in --concurrency of the generated users, then run each scenario
+        with every user sending requests from its own thread:
+
+        - home: load the first page of the home feed;
+        - like: like or unlike one of the most liked vacations;
+        - login: submit the login form.
+
+        Print the requests per second and the p50/p95/p99 latency of each
+        scenario and, with --compare, how they changed from the baseline.
+        """
+        usernames = list(
+            User.objects.filter(username__startswith=options['prefix'], is_staff=False)
+            .order_by('id').values_list('username', flat=True)[:options['concurrency']]
+        )
+        if not usernames:
+            raise CommandError(f"There are no users named {options['prefix']}*; create them with seed_scale first.")
+        baseline = self.load_baseline(options['compare']) if options['compare'] else None
+        self.vacation_ids = list(Vacation.objects.order_by('-likes_count', 'id').values_list('id', flat=True)[:100])
+        if options['url'] or options['throttle']:
+            results = self.run_scenarios(usernames, options)
+        else:
+            with override_settings(AUTH_THROTTLE_RATES={}):
+                results = self.run_scenarios(usernames, options)
+
+        if baseline:
+            self.report_changes(results, baseline)
+        if options['save']:
+            with open(options['save'], 'w') as baseline_file:
+                json.dump({
+                    'commit': current_commit(),
+                    'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                    'target': options['url'] or 'test client',
+                    'concurrency': len(usernames),
+                    'results': results,
+                }, baseline_file, indent=2)
+            self.stdout.write(f"Saved the results to {options['save']}.")
+
+    def run_scenarios(self, usernames, options):
+        """
+        Run every chosen scenario and return their summaries by name.
+        """
+        rng = random.Random(options['seed'])
+        results = {}
+        self.stdout.write(f"{'scenario':<10}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for scenario in options['scenario']:
+            sessions = [self.session(options['url']) for _ in usernames]
+            for session, username in zip(sessions, usernames):
+                session.username = username
+                session.password = options['password']
+                session.request('GET', reverse('login'))
+                if scenario != 'login' and not self.log_in(session):
+                    raise CommandError(f"Could not log in as {username} with the given password.")
+            if scenario == 'like':
+                if not self.vacation_ids:
+                    raise CommandError("There are no vacations to like.")
+                for session in sessions:
+                    session.rng = random.Random(rng.random())
+            summary = run_sessions(sessions, getattr(self, scenario), options['requests']).summary()
+            results[scenario] = summary
+            self.stdout.write(
+                f"{scenario:<10}{summary['requests']:>10}{summary['errors']:>8}{summary['throughput']:>10}"
+                f"{summary['p50']:>10}{summary['p95']:>10}{summary['p99']:>10}"
+            )
+        return results
+
+    def session(self, url):
+        return HttpSession(url) if url else ClientSession()
+
+    def log_in(self, session) -> bool:
+        """
+        Submit the login form and return whether it redirected.
+        """
+        return session.request('POST', reverse('login'), {'username': session.username, 'password': session.password}) == 302
+
+    def home(self, session) -> bool:
+        return session.request('GET', reverse('home')) == 200
+
+    def like(self, session) -> bool:
+        return session.request('POST', reverse('toggle_like'), {'vacation_id': session.rng.choice(self.vacation_ids)}) == 200
+
+    def login(self, session) -> bool:
+        return self.log_in(session)
+
+    def load_baseline(self, path):
+        try:
+            with open(path) as baseline_file:
+                return json.load(baseline_file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Could not read the baseline {path}: {error}")
+
+    def report_changes(self, results, baseline):
+        """
+        Print the change in throughput and latency of every scenario that
+        is also in the baseline, in percent.
+        """
+        self.stdout.write(f"\nCompared with {baseline.get('commit') or 'the baseline'} ({baseline.get('created', 'unknown date')}):")
+        self.stdout.write(f"{'scenario':<10}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+        for scenario, summary in results.items():
+            before = baseline.get('results', {}).get(scenario)
+            if not before:
+                continue
+            changes = [self.change(summary[key], before[key]) for key in ('throughput', 'p50', 'p95', 'p99')]
+            self.stdout.write(f"{scenario:<10}" + ''.join(f"{change:>10}" for change in changes))
+
+    def change(self, value, before) -> str:
+        if not before:
+            return 'n/a'
+        return f"{(value - before) / before * 100:+.1f}%"
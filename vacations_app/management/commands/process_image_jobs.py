@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from vacations_app.jobs import claim_next_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Run the queued image processing jobs, generating the resized copies of uploaded vacation images."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit when no job is due instead of waiting for more.")
+        parser.add_argument('--sleep', type=float, default=2, help="Seconds to wait before looking for jobs again when there are none.")
+        parser.add_argument('--max-jobs', type=int, help="Exit after running this many jobs.")
+
+    def handle(self, *args, **options):
+        """
+        Claim and run the due jobs one at a time, oldest first. Without
+        --once, keep polling the queue every --sleep seconds; run one such
+        worker, or several, next to the web server.
+        """
+        succeeded = failed = 0
+        while options['max_jobs'] is None or succeeded + failed < options['max_jobs']:
+            close_old_connections()
+            requeued = requeue_stale_jobs()
+            if requeued:
+                self.stderr.write(f"Requeued {requeued} jobs left running by a stopped worker.")
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+            if run_job(job):
+                succeeded += 1
+                self.stdout.write(f"Job {job.pk}: generated the image derivatives of vacation {job.vacation_id}.")
+            else:
+                failed += 1
+                self.stderr.write(f"Job {job.pk}: vacation {job.vacation_id} failed ({job.status}): {job.last_error}")
+        self.stdout.write(self.style.SUCCESS(f"Ran {succeeded + failed} image jobs, {failed} failed."))
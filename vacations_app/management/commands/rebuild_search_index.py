@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from vacations_app.models import Vacation
+
+
+class Command(BaseCommand):
+    help = "Recompute the full-text search vectors of all vacations."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help="Number of vacations to update per query.")
+
+    def handle(self, *args, **options):
+        """
+        Walk the vacations in primary key order and recompute the search
+        vectors one batch at a time, so no single UPDATE locks the whole
+        table. Vectors are kept up to date on save, so this is only needed
+        after changing how they are built or writing to the table directly.
+        """
+        if connection.vendor != 'postgresql':
+            self.stdout.write("Full-text search needs PostgreSQL; nothing to rebuild.")
+            return
+        last_id = 0
+        updated = 0
+        while True:
+            batch = list(
+                Vacation.objects.filter(pk__gt=last_id).order_by('pk')
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_id = batch[-1]
+            updated += Vacation.objects.filter(pk__in=batch).update_search_vectors()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the search vectors of {updated} vacations."))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from vacations_app.models import Likes, Vacation
+
+
+class Command(BaseCommand):
+    help = "Recount Vacation.likes_count from the Likes table, fixing any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Number of vacations to recount per query.")
+
+    def handle(self, *args, **options):
+        """
+        Walk the vacations in primary key order, one batch at a time, and
+        set every stored likes_count that differs from the number of Likes
+        rows to that number, stamping likes_updated_at so incremental exports
+        pick them up.
+
+        Each batch is fixed by a single UPDATE that counts the likes itself,
+        after locking the batch's vacation rows. That lock waits for the
+        likes and unlikes in flight on them, whose own counter updates lock
+        the same rows, so no like committed meanwhile is lost. Batching by
+        primary key keeps every lock short, so the command can run against a
+        live database.
+        """
+        batch_size = options['batch_size']
+        actual = Coalesce(Subquery(
+            Likes.objects.filter(vacation=OuterRef('pk'))
+            .order_by().values('vacation').annotate(total=Count('*')).values('total')
+        ), 0)
+        last_id = 0
+        checked = fixed = 0
+        while True:
+            batch = list(
+                Vacation.objects.filter(pk__gt=last_id).order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1]
+            checked += len(batch)
+            with transaction.atomic():
+                list(Vacation.objects.select_for_update().filter(pk__in=batch).order_by('pk').values_list('pk'))
+                fixed += Vacation.objects.filter(pk__in=batch).exclude(likes_count=actual).update(
+                    likes_count=actual, likes_updated_at=timezone.now(),
+                )
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} vacations, fixed {fixed} like counters."))
@@ -0,0 +1,43 @@
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from vacations_app.seeding import seed_countries, seed_likes, seed_users, seed_vacations
+
+
+class Command(BaseCommand):
+    help = "Fill the database with a large generated catalog of countries, vacations, users and likes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--countries', type=int, default=150, help="Number of countries to generate.")
+        parser.add_argument('--vacations', type=int, default=50000, help="Number of vacations to generate.")
+        parser.add_argument('--users', type=int, default=10000, help="Number of users to generate.")
+        parser.add_argument('--likes', type=int, default=500000, help="Number of likes to generate.")
+        parser.add_argument('--skew', type=float, default=1.1, help="Zipf exponent of the likes per vacation; higher is more skewed.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for the generated data.")
+        parser.add_argument('--prefix', default='loadtest', help="Prefix of the generated usernames.")
+        parser.add_argument('--password', default='LoadTest123!', help="Password of every generated user.")
+
+    def handle(self, *args, **options):
+        """
+        Generate the data with bulk inserts in a single transaction.
+
+        Countries and likes are skewed like real traffic: a few countries
+        have most of the vacations and a few vacations collect most of the
+        likes. The users can log in with --password, which the load_test
+        command uses.
+        """
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+        with transaction.atomic():
+            country_ids = seed_countries(options['countries'], prefix='Destination')
+            vacation_ids = seed_vacations(options['vacations'], country_ids, rng)
+            user_ids = seed_users(options['users'], make_password(options['password']), prefix=options['prefix'])
+            likes = seed_likes(options['likes'], user_ids, vacation_ids, rng, skew=options['skew']) if user_ids and vacation_ids else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(country_ids)} countries, {len(vacation_ids)} vacations, {len(user_ids)} users "
+            f"and {likes} likes in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_existing_likes(apps, schema_editor):
+    Vacation = apps.get_model('vacations_app', 'Vacation')
+    Likes = apps.get_model('vacations_app', 'Likes')
+    counts = (
+        Likes.objects.filter(vacation=OuterRef('pk'))
+        .order_by().values('vacation').annotate(total=Count('*')).values('total')
+    )
+    Vacation.objects.update(likes_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacations_app', '0006_alter_vacation_description'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacation',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_existing_likes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacations_app', '0007_vacation_likes_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacation',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
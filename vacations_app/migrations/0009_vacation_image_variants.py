@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacations_app', '0008_vacation_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacation',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacations_app', '0009_vacation_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='vacation',
+            options={'ordering': ['start_date', 'id']},
+        ),
+        migrations.AddConstraint(
+            model_name='likes',
+            constraint=models.UniqueConstraint(fields=('user', 'vacation'), name='likes_user_vacation_uniq'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='likes',
+            unique_together=set(),
+        ),
+        migrations.AlterField(
+            model_name='likes',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='likes', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='likes',
+            name='vacation',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='likes', to='vacations_app.vacation'),
+        ),
+        migrations.AddIndex(
+            model_name='likes',
+            index=models.Index(fields=['vacation', 'user'], name='likes_vacation_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacation',
+            index=models.Index(fields=['start_date', 'id'], name='vacation_start_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacations_app', '0010_query_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacation',
+            name='likes_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
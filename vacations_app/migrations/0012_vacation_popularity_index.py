@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacations_app', '0011_vacation_likes_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacation',
+            index=models.Index(fields=['-likes_count', 'id'], name='vacation_likes_count_id_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:48
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Create the GIN index of the search vectors. GIN indexes only exist on
+    PostgreSQL, so the index is not part of the model state; that way the
+    SQLite test database can still be migrated and its tables rebuilt.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE INDEX IF NOT EXISTS vacation_search_vector_idx ON vacations_app_vacation USING gin (search_vector)')
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS vacation_search_vector_idx')
+
+
+def fill_search_vectors(apps, schema_editor):
+    """
+    Compute the search vector of the existing vacations, as
+    VacationQuerySet.update_search_vectors() does.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Country = apps.get_model('vacations_app', 'Country')
+    Vacation = apps.get_model('vacations_app', 'Vacation')
+    country_name = Subquery(Country.objects.filter(pk=OuterRef('country_id')).values('country_name')[:1])
+    Vacation.objects.using(schema_editor.connection.alias).update(search_vector=(
+        SearchVector(country_name, weight='A', config='english')
+        + SearchVector('description', weight='B', config='english')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacations_app', '0012_vacation_popularity_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacation',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacations_app', '0013_vacation_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacation',
+            index=models.Index(fields=['country', 'start_date', 'id'], name='vacation_country_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacation',
+            index=models.Index(fields=['price'], name='vacation_price_idx'),
+        ),
+        migrations.AlterField(
+            model_name='vacation',
+            name='country',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='vacations_app.country'),
+        ),
+    ]
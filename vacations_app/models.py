@@ -1,7 +1,15 @@
-from django.db import models
+from asgiref.sync import sync_to_async
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, SearchVectorField
+from django.db import connections, models, transaction
+from django.db.models.functions import Cast
 from django.core.validators import MinValueValidator, MaxValueValidator, MinLengthValidator
 from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.utils import timezone
 from datetime import date
+from typing import Optional
+from .images import delete_derivatives
 
 # Create your models here.
 class Country(models.Model):
@@ -14,19 +22,110 @@ class Country(models.Model):
         or when printing the object
         """
         return self.country_name
+
+    def save(self, *args, **kwargs):
+        """
+        Save the country and bump updated_at on its vacations, since their
+        cached cards show the country name. Their search vectors, which
+        include the country name, are rebuilt too.
+        """
+        super().save(*args, **kwargs)
+        self.vacation_set.update(updated_at=timezone.now())
+        self.vacation_set.update_search_vectors()
     
 
     
     
 
 
+# Text search configuration of the vacation search vectors.
+SEARCH_CONFIG = 'english'
+
+
+class VacationQuerySet(models.QuerySet):
+    def for_feed(self, user) -> 'VacationQuerySet':
+        """
+        Return the vacations with their country joined in and a 'liked'
+        annotation, an Exists subquery indicating whether ``user`` has liked
+        each vacation. The number of likes is read from the denormalized
+        likes_count column, so listing vacations takes a single query. The
+        search vector, which no page shows, is not loaded.
+        """
+        user_likes = Likes.objects.filter(vacation=models.OuterRef('pk'), user=user)
+        return self.select_related('country').defer('search_vector').annotate(liked=models.Exists(user_likes))
+
+    def filter_by(self, country=None, min_price=None, max_price=None, start_after=None, end_before=None) -> 'VacationQuerySet':
+        """
+        Return the vacations matching the given filters, ignoring the ones
+        that are None: the country (an id, or a name matched without regard
+        to case), a price range with both bounds included, the earliest
+        start date and the latest end date.
+        """
+        queryset = self
+        if country is not None:
+            country = str(country)
+            queryset = queryset.filter(models.Q(country_id=country) if country.isdigit() else models.Q(country__country_name__iexact=country))
+        if min_price is not None:
+            queryset = queryset.filter(price__gte=min_price)
+        if max_price is not None:
+            queryset = queryset.filter(price__lte=max_price)
+        if start_after is not None:
+            queryset = queryset.filter(start_date__gte=start_after)
+        if end_before is not None:
+            queryset = queryset.filter(end_date__lte=end_before)
+        return queryset
+
+    def search(self, text: str) -> 'VacationQuerySet':
+        """
+        Return the vacations matching the search ``text`` with a 'rank'
+        annotation, higher for better matches.
+
+        On PostgreSQL this is a full-text search of the search_vector
+        column, answered from its GIN index, with the text parsed like a web
+        search (quoted phrases, 'or', '-word'). Other databases, such as the
+        SQLite test runs, fall back to requiring every word in the
+        description or the country name, with a rank of 0.
+
+        ts_rank returns a single precision real. It is cast to double
+        precision, the type of the Python float a keyset cursor stores, so
+        the cursor compares equal to the rank of the row it came from.
+        """
+        if connections[self.db].vendor == 'postgresql':
+            query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+            rank = Cast(SearchRank(models.F('search_vector'), query), models.FloatField())
+            return self.filter(search_vector=query).annotate(rank=rank)
+        queryset = self
+        for word in text.split():
+            queryset = queryset.filter(models.Q(description__icontains=word) | models.Q(country__country_name__icontains=word))
+        return queryset.annotate(rank=models.Value(0.0, output_field=models.FloatField()))
+
+    def update_search_vectors(self) -> int:
+        """
+        Recompute the search_vector column of these vacations from their
+        country name (weighted highest) and description, and return the
+        number of vacations updated. Does nothing outside PostgreSQL.
+        """
+        if connections[self.db].vendor != 'postgresql':
+            return 0
+        country_name = models.Subquery(Country.objects.filter(pk=models.OuterRef('country_id')).values('country_name')[:1])
+        return self.update(search_vector=(
+            SearchVector(country_name, weight='A', config=SEARCH_CONFIG)
+            + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+        ))
+
+
 class Vacation(models.Model):
-    country = models.ForeignKey(Country, on_delete=models.CASCADE, blank= False, null=False)
+    country = models.ForeignKey(Country, on_delete=models.CASCADE, blank= False, null=False, db_index=False)
     description = models.TextField(blank=False, null=False, validators=[MinLengthValidator(10, message="Description must be at least 10 characters")])
     start_date = models.DateField(blank=False, null=False)
     end_date = models.DateField(blank=False, null=False)
     price = models.DecimalField(max_digits=10, decimal_places=2, blank=False, null=False)
     image = models.ImageField(upload_to='vacation_images/', blank=True, null=True)
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(default=timezone.now, editable=False)
+    likes_updated_at = models.DateTimeField(blank=True, null=True, editable=False)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    search_vector = SearchVectorField(blank=True, null=True, editable=False)
 
     def clean(self):
        
@@ -89,11 +188,26 @@ class Vacation(models.Model):
         The parent class's save method is called after full_clean to save the
         instance to the database.
 
+        When an existing vacation is saved, likes_count and likes_updated_at
+        are left out of the update so that stale in-memory values never
+        overwrite the counter maintained by the like and unlike writes. The
+        search vector is computed by the database after the save.
+
+        updated_at is bumped on every save, which changes the cache key of the
+        vacation's card on the home page.
+
         This method is called when the model instance is saved.
         """
         
+        self.updated_at = timezone.now()
         self.full_clean()
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in ('likes_count', 'likes_updated_at', 'search_vector')
+            ]
         super().save(*args, **kwargs)
+        Vacation.objects.filter(pk=self.pk).update_search_vectors()
     def delete(self, *args, **kwargs):
         """
         Override the default delete method to delete the image as well.
@@ -109,18 +223,203 @@ class Vacation(models.Model):
         """
 
         if self.image:
+            delete_derivatives(self.image.storage, self.image_variants)
             self.image.delete(save=False)
+        cache.delete(self.card_cache_key())
         super().delete(*args, **kwargs)
+
+    def card_cache_key(self) -> str:
+        """
+        Return the cache key of this vacation's card fragment, as built by the
+        {% cache %} tag in vacation_cards.html. The key changes whenever
+        updated_at does, so saved vacations never show a stale card.
+        """
+        return make_template_fragment_key('vacation_card', [self.id, self.updated_at.isoformat()])
+
+    def srcset(self, extension: str) -> str:
+        """
+        Return a srcset attribute value listing the resized copies of the
+        image in the given format, or an empty string if there are none yet.
+        """
+        variants = self.image_variants.get(extension, {})
+        return ', '.join(
+            f'{self.image.storage.url(name)} {width}w'
+            for width, name in sorted(variants.items(), key=lambda item: int(item[0]))
+        )
+
+    @property
+    def webp_srcset(self) -> str:
+        return self.srcset('webp')
+
+    @property
+    def jpeg_srcset(self) -> str:
+        return self.srcset('jpeg')
             
+    objects = VacationQuerySet.as_manager()
+
     class Meta:
         unique_together = ('country', 'start_date', 'end_date')
-        ordering = ['start_date']
+        ordering = ['start_date', 'id']
+        indexes = [
+            # Every listing is ordered and paginated by (start_date, id).
+            models.Index(fields=['start_date', 'id'], name='vacation_start_date_id_idx'),
+            # The popular sort of the home feed, most liked first.
+            models.Index(fields=['-likes_count', 'id'], name='vacation_likes_count_id_idx'),
+            # The country and price filters of the home feed. The country
+            # index also serves the (start_date, id) ordering within a country,
+            # and replaces the plain foreign key index on country_id.
+            models.Index(fields=['country', 'start_date', 'id'], name='vacation_country_start_idx'),
+            models.Index(fields=['price'], name='vacation_price_idx'),
+            # search_vector has a GIN index, vacation_search_vector_idx, that
+            # only exists on PostgreSQL and so is created by migration 0013.
+        ]
+
+
+class ImageJob(models.Model):
+    """
+    A request to generate the resized copies of a vacation's image, run by
+    the process_image_jobs worker outside the request that saved the image
+    (see vacations_app.jobs).
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    vacation = models.ForeignKey(Vacation, on_delete=models.CASCADE, related_name='image_jobs')
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    # A pending job is not picked up before run_after; failed attempts are
+    # retried later and later.
+    run_after = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Image job {self.pk} for vacation {self.vacation_id} ({self.status})"
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            # The worker's "next pending job" query.
+            models.Index(fields=['status', 'run_after', 'id'], name='imagejob_status_run_after_idx'),
+        ]
+
+
+class LikesManager(models.Manager):
+    def _adjust_likes_count(self, cursor, vacation_id, delta: int) -> int:
+        """
+        Add ``delta`` to the vacation's likes_count in place, stamp
+        likes_updated_at and return the new count. The increment is done by
+        the database, so concurrent likes never overwrite each other.
+
+        The count never goes below 0: a like added without like(), from the
+        admin or a fixture for instance, was never counted, and removing it
+        must not violate the column's check constraint.
+        """
+        ops = connections[self.db].ops
+        cursor.execute(
+            f"UPDATE {ops.quote_name(Vacation._meta.db_table)} "
+            f"SET likes_count = CASE WHEN likes_count + %s < 0 THEN 0 ELSE likes_count + %s END, likes_updated_at = %s "
+            f"WHERE id = %s RETURNING likes_count",
+            [delta, delta, ops.adapt_datetimefield_value(timezone.now()), vacation_id],
+        )
+        return cursor.fetchone()[0]
+
+    def like(self, user, vacation_id) -> Optional[int]:
+        """
+        Record that ``user`` likes the vacation with the given id.
+
+        The like is written with a single INSERT ... ON CONFLICT DO NOTHING,
+        so a concurrent double click can never raise an IntegrityError, and
+        the INSERT selects the vacation id so a missing vacation inserts
+        nothing. The vacation's likes_count is incremented in the same
+        transaction.
+
+        Returns the new likes_count if a like was added, or None if the user
+        had already liked the vacation or the vacation does not exist.
+        """
+        ops = connections[self.db].ops
+        with transaction.atomic(using=self.db), connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {ops.quote_name(self.model._meta.db_table)} (user_id, vacation_id) "
+                f"SELECT %s, id FROM {ops.quote_name(Vacation._meta.db_table)} WHERE id = %s "
+                f"ON CONFLICT (user_id, vacation_id) DO NOTHING",
+                [user.pk, vacation_id],
+            )
+            if cursor.rowcount != 1:
+                return None
+            return self._adjust_likes_count(cursor, vacation_id, 1)
+
+    def unlike(self, user, vacation_id) -> Optional[int]:
+        """
+        Remove the like of ``user`` from the vacation with the given id with
+        a single conditional DELETE, decrementing the vacation's likes_count
+        in the same transaction.
+
+        Returns the new likes_count if a like was removed, or None if there
+        was none.
+        """
+        with transaction.atomic(using=self.db), connections[self.db].cursor() as cursor:
+            deleted, _ = self.filter(user=user, vacation_id=vacation_id).delete()
+            if not deleted:
+                return None
+            return self._adjust_likes_count(cursor, vacation_id, -1)
+
+    def uncount_user(self, user) -> int:
+        """
+        Take the likes of ``user`` off the likes_count of the vacations they
+        liked, before the user, and their likes with them, are deleted.
+        Return the number of vacations updated.
+        """
+        liked = self.filter(user=user).values('vacation_id')
+        return Vacation.objects.filter(pk__in=liked, likes_count__gt=0).update(
+            likes_count=models.F('likes_count') - 1, likes_updated_at=timezone.now(),
+        )
+
+    async def alike(self, user, vacation_id) -> Optional[int]:
+        """
+        Asynchronous version of like(). The async ORM cannot run
+        transactions, so the upsert and counter update run in a thread.
+        """
+        return await sync_to_async(self.like)(user, vacation_id)
+
+    async def aunlike(self, user, vacation_id) -> Optional[int]:
+        """
+        Asynchronous version of unlike(), run in a thread like alike().
+        """
+        return await sync_to_async(self.unlike)(user, vacation_id)
 
 
 class Likes(models.Model):
-    user = models.ForeignKey('auth.User', on_delete=models.CASCADE,related_name='likes', blank=False, null=False)
-    vacation = models.ForeignKey(Vacation, on_delete=models.CASCADE, related_name='likes', blank=False, null=False)
+    # Both foreign keys are covered by the composite indexes below, so they
+    # don't get single column indexes of their own.
+    user = models.ForeignKey('auth.User', on_delete=models.CASCADE,related_name='likes', blank=False, null=False, db_index=False)
+    vacation = models.ForeignKey(Vacation, on_delete=models.CASCADE, related_name='likes', blank=False, null=False, db_index=False)
+
+    objects = LikesManager()
 
     class Meta:
-        unique_together = ('user', 'vacation')
+        constraints = [
+            # Leads with user: serves "has this user liked this vacation" and
+            # "the vacations this user liked", and the upsert in LikesManager.
+            models.UniqueConstraint(fields=['user', 'vacation'], name='likes_user_vacation_uniq'),
+        ]
+        indexes = [
+            # Leads with vacation: serves counting and deleting the likes of
+            # a vacation.
+            models.Index(fields=['vacation', 'user'], name='likes_vacation_user_idx'),
+        ]
+
 
+def uncount_deleted_user_likes(sender, instance, **kwargs):
+    """
+    pre_delete receiver for the user model. Deleting a user cascades to
+    their Likes rows without going through LikesManager.unlike(), so their
+    likes are taken off the counters first.
+    """
+    Likes.objects.uncount_user(instance)
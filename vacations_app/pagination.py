@@ -0,0 +1,124 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import BadRequest, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Field, Q, QuerySet
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the ordering values of the last row of a page into an opaque,
+    URL safe cursor string.
+    """
+    payload = json.dumps(list(values), cls=DjangoJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, fields: Sequence[Field]) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor into one value per ordering
+    field, converted and validated by that field, so a tampered cursor can
+    never reach the database.
+
+    Raises BadRequest if the cursor is malformed, does not hold one value
+    per field, or holds a value a field does not accept.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise BadRequest("Invalid cursor.")
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise BadRequest("Invalid cursor.")
+    converted = []
+    for field, value in zip(fields, values):
+        # Every ordering field is required, and JSON has no dates or
+        # decimals, so the only types a genuine cursor holds are these.
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            raise BadRequest("Invalid cursor.")
+        try:
+            value = field.to_python(value)
+            field.run_validators(value)
+        except (ValidationError, ValueError, TypeError):
+            raise BadRequest("Invalid cursor.")
+        converted.append(value)
+    return converted
+
+
+def ordering_fields(queryset: QuerySet, ordering: Sequence[str]) -> List[Field]:
+    """
+    Return the model field, or for an annotation such as a search rank its
+    output field, of each field name in ``ordering``.
+    """
+    return [
+        queryset.query.annotations[name].output_field if name in queryset.query.annotations
+        else queryset.model._meta.get_field(name)
+        for name in (field.lstrip('-') for field in ordering)
+    ]
+
+
+def keyset_filter(ordering: Sequence[str], values: Sequence[Any]) -> Q:
+    """
+    Build the filter selecting the rows that come strictly after ``values``
+    in the given ordering.
+
+    For an ordering (a, b) this is ``a > x OR (a = x AND b > y)``, with the
+    comparison flipped for fields ordered descending ('-a'). Unlike OFFSET,
+    the database can answer this with an index range scan, so every page
+    costs the same no matter how deep into the catalog it is.
+    """
+    condition = Q()
+    for position, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        step = Q(**{f'{name}__{lookup}': values[position]})
+        for previous, value in zip(ordering[:position], values):
+            step &= Q(**{previous.lstrip('-'): value})
+        condition |= step
+    return condition
+
+
+def keyset_page(queryset: QuerySet, ordering: Sequence[str], cursor: Optional[str], page_size: int) -> QuerySet:
+    """
+    Return the unevaluated query for the page of ``queryset`` that starts
+    after ``cursor``, with one extra row to tell whether a next page exists.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(keyset_filter(ordering, decode_cursor(cursor, ordering_fields(queryset, ordering))))
+    return queryset[:page_size + 1]
+
+
+def split_page(rows: List[Any], ordering: Sequence[str], page_size: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Split the rows fetched through keyset_page into the page and the cursor
+    of the following page, which is None on the last page.
+    """
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, field.lstrip('-')) for field in ordering])
+
+
+def paginate_keyset(queryset: QuerySet, ordering: Sequence[str], cursor: Optional[str], page_size: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Return one page of ``queryset`` and the cursor of the following page.
+
+    The queryset is ordered by ``ordering``, which must end with a unique
+    field (such as 'id') so that every row has a distinct position. The
+    next cursor is None on the last page.
+    """
+    return split_page(list(keyset_page(queryset, ordering, cursor, page_size)), ordering, page_size)
+
+
+async def apaginate_keyset(queryset: QuerySet, ordering: Sequence[str], cursor: Optional[str], page_size: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Asynchronous version of paginate_keyset, fetching the page with async
+    iteration of the queryset.
+    """
+    rows = [row async for row in keyset_page(queryset, ordering, cursor, page_size)]
+    return split_page(rows, ordering, page_size)
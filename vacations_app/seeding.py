@@ -0,0 +1,142 @@
+import io
+import itertools
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Sequence, TypeVar
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from vacations_app.models import Country, Likes, Vacation
+
+T = TypeVar('T')
+
+# Images shipped in uploads/vacation_images, reused by generated vacations.
+SAMPLE_IMAGES = (
+    'vacation_images/japan.jpeg', 'vacation_images/rome.jpg', 'vacation_images/greece.jpg',
+    'vacation_images/thailand.jpg', 'vacation_images/canada.jpg', 'vacation_images/brazil.jpeg',
+)
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Yield lists of up to ``size`` items.
+    """
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def zipf_weights(count: int, skew: float) -> List[float]:
+    """
+    Return ``count`` weights following a Zipf distribution: the item of rank
+    r gets weight 1 / r ** skew, so a few items get most of the traffic.
+    """
+    return [1 / rank ** skew for rank in range(1, count + 1)]
+
+
+def seed_countries(count: int, prefix: str = 'Country') -> List[int]:
+    """
+    Create ``count`` countries and return their ids.
+    """
+    existing = set(Country.objects.filter(country_name__startswith=prefix).values_list('country_name', flat=True))
+    names = (f'{prefix} {number}' for number in itertools.count(1))
+    new = [Country(country_name=name) for name in itertools.islice((name for name in names if name not in existing), count)]
+    Country.objects.bulk_create(new, batch_size=1000)
+    return list(Country.objects.filter(country_name__in=[country.country_name for country in new]).values_list('id', flat=True))
+
+
+def seed_vacations(count: int, country_ids: Sequence[int], rng: random.Random, batch_size: int = 5000) -> List[int]:
+    """
+    Create ``count`` vacations spread over the next five years and return
+    their ids. Countries are picked with a Zipf skew, so some destinations
+    have many more packages than others.
+    """
+    weights = zipf_weights(len(country_ids), 1.1)
+    today = date.today()
+    first_id = (Vacation.objects.order_by('-id').values_list('id', flat=True).first() or 0)
+
+    def generate():
+        used = set()
+        for number in range(count):
+            while True:
+                country_id = rng.choices(country_ids, weights)[0]
+                start = today + timedelta(days=rng.randint(1, 5 * 365))
+                end = start + timedelta(days=rng.randint(3, 21))
+                if (country_id, start, end) not in used:
+                    used.add((country_id, start, end))
+                    break
+            yield Vacation(
+                country_id=country_id,
+                description=f'Generated vacation package number {number}',
+                start_date=start,
+                end_date=end,
+                price=Decimal(rng.randint(300, 9500)),
+                image=rng.choice(SAMPLE_IMAGES),
+            )
+
+    for batch in batched(generate(), batch_size):
+        Vacation.objects.bulk_create(batch, ignore_conflicts=True)
+    Vacation.objects.filter(id__gt=first_id).update_search_vectors()
+    return list(Vacation.objects.filter(id__gt=first_id).values_list('id', flat=True))
+
+
+def seed_users(count: int, password_hash: str = '!', prefix: str = 'user', batch_size: int = 5000) -> List[int]:
+    """
+    Create ``count`` users with the given stored password hash and return
+    their ids. The default hash is an unusable password; pass the result of
+    make_password() to create users that can log in, hashing it only once.
+    """
+    first_id = (User.objects.order_by('-id').values_list('id', flat=True).first() or 0)
+    # A random token keeps the usernames unique across several seeding runs.
+    token = random.getrandbits(32)
+    users = (
+        User(
+            username=f'{prefix}{number}-{token:08x}@example.com',
+            email=f'{prefix}{number}-{token:08x}@example.com',
+            first_name='Seeded',
+            last_name=f'User {number}',
+            password=password_hash,
+        )
+        for number in range(count)
+    )
+    for batch in batched(users, batch_size):
+        User.objects.bulk_create(batch)
+    return list(User.objects.filter(id__gt=first_id).values_list('id', flat=True))
+
+
+def seed_likes(count: int, user_ids: Sequence[int], vacation_ids: Sequence[int], rng: random.Random,
+               skew: float = 1.0, batch_size: int = 10000) -> int:
+    """
+    Create about ``count`` likes and return the number created.
+
+    Vacations are picked with a Zipf skew, so a few packages collect most of
+    the likes, and likes are spread evenly over the users. A user never likes
+    the same vacation twice. Afterwards the likes_count column is recounted.
+    """
+    weights = list(itertools.accumulate(zipf_weights(len(vacation_ids), skew)))
+    ranked = list(vacation_ids)
+    rng.shuffle(ranked)
+    per_user, extra = divmod(count, len(user_ids))
+
+    def generate():
+        for position, user_id in enumerate(user_ids):
+            wanted = min(per_user + (1 if position < extra else 0), len(ranked))
+            chosen = set()
+            for _ in range(3):
+                if len(chosen) < wanted:
+                    chosen.update(rng.choices(ranked, cum_weights=weights, k=wanted - len(chosen)))
+            # With a heavy skew the weighted draws keep hitting the same few
+            # vacations; fill whatever is left uniformly.
+            while len(chosen) < wanted:
+                chosen.add(rng.choice(ranked))
+            for vacation_id in itertools.islice(chosen, wanted):
+                yield Likes(user_id=user_id, vacation_id=vacation_id)
+
+    created = 0
+    for batch in batched(generate(), batch_size):
+        Likes.objects.bulk_create(batch, ignore_conflicts=True)
+        created += len(batch)
+    call_command('recount_likes', stdout=io.StringIO())
+    return created
@@ -0,0 +1,33 @@
+from rest_framework import serializers
+
+from vacations_app.models import Vacation
+
+
+class VacationSerializer(serializers.ModelSerializer):
+    country = serializers.CharField(source='country.country_name', read_only=True)
+
+    class Meta:
+        model = Vacation
+        fields = ['id', 'country', 'description', 'start_date', 'end_date', 'price', 'image', 'likes_count', 'updated_at']
+        read_only_fields = fields
+
+
+class VacationFilterSerializer(serializers.Serializer):
+    """
+    Validate the query string filters of the vacations API.
+    """
+    country = serializers.CharField(required=False, help_text="Country id or name.")
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    start_after = serializers.DateField(required=False, help_text="Earliest start date.")
+    end_before = serializers.DateField(required=False, help_text="Latest end date.")
+
+    def validate_country(self, value: str) -> str:
+        """
+        Reject a country id out of the range of the id column, which the
+        database refuses to compare with.
+        """
+        value = value.strip()
+        if value.isdigit() and int(value) > 2**63 - 1:
+            raise serializers.ValidationError("Country id is out of range.")
+        return value
@@ -1,12 +1,37 @@
-from django.test import TestCase
-from .models import Vacation, Likes, Country
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase, TransactionTestCase
+from .models import Vacation, Likes, Country, ImageJob
+from .views import HomeView
+from .pagination import encode_cursor
+from .images import generate_derivatives
+from .loadtesting import run_load
+from vacations_project.testing import load_initial_data, sample_jpeg
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
+import asyncio
+import csv
+import gzip
+import importlib
 import io
+import json
+import os
+import re
+import sys
+import tempfile
+from unittest import mock, skipUnless
 from PIL import Image
-from django.core.exceptions import ValidationError
+try:
+    import jinja2
+except ImportError:
+    jinja2 = None
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.cache import cache
+from django.utils import timezone
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from datetime import date, timedelta
 
 
 class VacationTestCase(TestCase):
@@ -27,19 +52,14 @@ class VacationTestCase(TestCase):
         - Creates a test image
         """
 
-        call_command('loaddata', 'initial_data.json')
+        load_initial_data()
         cls.user = User.objects.get(username='testuser@example.com')
         cls.user_password = 'UserPass123'
         cls.admin = User.objects.get(username='admin@example.com')
         cls.admin_password = 'Admin456!'
-        img_io = io.BytesIO()
-        image = Image.new("RGB", (100, 100), color="red")
-        image.save(img_io, format="JPEG")
-        img_io.seek(0)
-
         cls.image = SimpleUploadedFile(
             "test_image.jpg",
-            img_io.read(),
+            sample_jpeg(),
             content_type="image/jpeg"
 )
         cls.country = Country.objects.get(id=1)
@@ -898,5 +918,1018 @@ class VacationTestCase(TestCase):
             )
 
         self.assertIn('Country does not exist.', str(context.exception))
+
+    def create_vacations(self, count):
+        """
+        Bulk create ``count`` vacations for the test country, bypassing
+        Vacation.save() so large catalogs can be built quickly.
+        """
+        start = date.today() + timedelta(days=1)
+        Vacation.objects.bulk_create(
+            Vacation(
+                country=self.country,
+                description='Generated vacation package',
+                start_date=start + timedelta(days=i),
+                end_date=start + timedelta(days=i + 7),
+                price='1000.00',
+                image='vacation_images/japan.jpeg',
+            )
+            for i in range(count)
+        )
+
+    def test_home_query_count_is_constant(self):
+        """
+        This test checks that the home page costs the same number of
+        queries no matter how many vacations are in the catalog.
+
+        The test renders the home page with the initial data, then with
+        thousands of extra vacations, and checks that the number of
+        queries does not change.
+        """
+        self.client.login(username=self.user.username, password=self.user_password)
+        # The first request after logging in also caches the user.
+        self.client.get(reverse('home'))
+        with CaptureQueriesContext(connection) as small_catalog:
+            self.client.get(reverse('home'))
+        self.create_vacations(2000)
+        with CaptureQueriesContext(connection) as large_catalog:
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(small_catalog), len(large_catalog))
+
+    def test_home_annotates_likes(self):
+        """
+        This test checks that the home page annotates each vacation with
+        its number of likes and whether the current user liked it.
+        """
+        other_user = User.objects.create_user(username='other@example.com', password='OtherPass123')
+        Likes.objects.like(self.user, 1)
+        Likes.objects.like(other_user, 1)
+        Likes.objects.like(other_user, 2)
+        self.client.login(username=self.user.username, password=self.user_password)
+        response = self.client.get(reverse('home'))
+        vacations = {vacation.id: vacation for vacation in response.context['vacations']}
+        self.assertEqual(vacations[1].likes_count, 2)
+        self.assertTrue(vacations[1].liked)
+        self.assertEqual(vacations[2].likes_count, 1)
+        self.assertFalse(vacations[2].liked)
+        self.assertEqual(vacations[3].likes_count, 0)
+        self.assertFalse(vacations[3].liked)
+
+    def test_home_is_paginated_by_cursor(self):
+        """
+        This test checks that the home page shows one page of vacations and
+        that following the cursors through the cards endpoint visits every
+        vacation exactly once, in (start_date, id) order.
+        """
+        self.create_vacations(60)
+        Vacation.objects.filter(id__in=[13, 14, 15]).update(start_date='2030-01-01')
+        self.client.login(username=self.user.username, password=self.user_password)
+        response = self.client.get(reverse('home'))
+        seen = [vacation.id for vacation in response.context['vacations']]
+        self.assertEqual(len(seen), HomeView.page_size)
+        cursor = response.context['next_cursor']
+        while cursor:
+            response = self.client.get(reverse('vacation_cards'), {'cursor': cursor})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotContains(response, '<html')
+            seen += [vacation.id for vacation in response.context['vacations']]
+            cursor = response.context['next_cursor']
+        expected = list(Vacation.objects.order_by('start_date', 'id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_home_invalid_cursor(self):
+        """
+        This test checks that a malformed cursor, or one holding values the
+        ordering fields do not accept, results in a 400 response.
+        """
+        self.client.login(username=self.user.username, password=self.user_password)
+        response = self.client.get(reverse('vacation_cards'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+        for values in (['abc', 1], ['2020-01-01', 'x'], [{'a': 1}, 1], [None, None], ['2020-01-01', 10**30], ['2020-01-01', True]):
+            response = self.client.get(reverse('vacation_cards'), {'cursor': encode_cursor(values)})
+            self.assertEqual(response.status_code, 400, values)
+        response = self.client.get(reverse('vacation_cards'), {'sort': 'popular', 'cursor': encode_cursor(['x', 1])})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('vacation_cards'), {'sort': 'popular', 'cursor': encode_cursor([-1, 1])})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('vacation_cards'), {'cursor': encode_cursor(['2020-01-01', 1])})
+        self.assertEqual(response.status_code, 200)
+
+    def test_like_and_unlike_update_likes_count(self):
+        """
+        This test checks that liking and unliking a vacation keeps its
+        likes_count column in step with the Likes table.
+        """
+        self.client.login(username=self.user.username, password=self.user_password)
+        self.client.post(reverse('like_vacation'), {'vacation_id': 1})
+        self.assertEqual(Vacation.objects.get(id=1).likes_count, 1)
+        self.client.post(reverse('like_vacation'), {'vacation_id': 1})
+        self.assertEqual(Vacation.objects.get(id=1).likes_count, 1)
+        self.client.post(reverse('unlike_vacation'), {'vacation_id': 1})
+        self.assertEqual(Vacation.objects.get(id=1).likes_count, 0)
+        self.client.post(reverse('unlike_vacation'), {'vacation_id': 1})
+        self.assertEqual(Vacation.objects.get(id=1).likes_count, 0)
+
+    def test_unlike_uncounted_like(self):
+        """
+        This test checks that removing a like created directly, which was
+        never added to likes_count, leaves the count at 0 instead of
+        failing.
+        """
+        Likes.objects.create(user=self.user, vacation_id=1)
+        self.assertEqual(Likes.objects.unlike(self.user, 1), 0)
+        Likes.objects.create(user=self.user, vacation_id=1)
+        self.client.login(username=self.user.username, password=self.user_password)
+        response = self.client.post(reverse('toggle_like'), {'vacation_id': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Vacation.objects.get(id=1).likes_count, 0)
+
+    def test_deleting_user_uncounts_their_likes(self):
+        """
+        This test checks that deleting a user takes their likes off the
+        likes_count of the vacations they liked.
+        """
+        other = User.objects.create_user(username='other@example.com', password='OtherPass123')
+        Likes.objects.like(self.user, 1)
+        Likes.objects.like(other, 1)
+        Likes.objects.like(other, 2)
+        other.delete()
+        self.assertEqual(Vacation.objects.get(id=1).likes_count, 1)
+        self.assertEqual(Vacation.objects.get(id=2).likes_count, 0)
+        self.assertEqual(Likes.objects.count(), 1)
+
+    def test_saving_vacation_keeps_likes_count(self):
+        """
+        This test checks that saving a vacation loaded before a like was
+        added does not overwrite its likes_count with the stale value.
+        """
+        vacation = Vacation.objects.get(id=1)
+        Likes.objects.like(self.user, 1)
+        vacation.description = 'Updated description'
+        vacation.save()
+        self.assertEqual(Vacation.objects.get(id=1).likes_count, 1)
+
+    def test_recount_likes_command(self):
+        """
+        This test checks that the recount_likes command fixes like counters
+        that have drifted from the Likes table, with one UPDATE per batch
+        that counts the likes itself.
+        """
+        Likes.objects.create(user=self.user, vacation_id=1)
+        Vacation.objects.filter(id=2).update(likes_count=5)
+        out = io.StringIO()
+        with CaptureQueriesContext(connection) as captured:
+            call_command('recount_likes', batch_size=5, stdout=out)
+        updates = [query['sql'] for query in captured.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 3)
+        self.assertTrue(all('COUNT(*)' in sql for sql in updates))
+        self.assertEqual(Vacation.objects.get(id=1).likes_count, 1)
+        self.assertEqual(Vacation.objects.get(id=2).likes_count, 0)
+        self.assertIn('fixed 2 like counters', out.getvalue())
+
+    def test_toggle_like_returns_json(self):
+        """
+        This test checks that the toggle endpoint likes a vacation, then
+        unlikes it on the next call, returning the new state and count as
+        JSON each time.
+        """
+        other_user = User.objects.create_user(username='other@example.com', password='OtherPass123')
+        Likes.objects.like(other_user, 1)
+        self.client.login(username=self.user.username, password=self.user_password)
+        response = self.client.post(reverse('toggle_like'), {'vacation_id': 1})
+        self.assertEqual(response.json(), {'liked': True, 'likes_count': 2})
+        self.assertTrue(Likes.objects.filter(user=self.user, vacation_id=1).exists())
+        response = self.client.post(reverse('toggle_like'), {'vacation_id': 1})
+        self.assertEqual(response.json(), {'liked': False, 'likes_count': 1})
+        self.assertFalse(Likes.objects.filter(user=self.user, vacation_id=1).exists())
+
+    def test_toggle_like_rejections(self):
+        """
+        This test checks that the toggle endpoint only accepts POST requests
+        from regular users for vacations that exist.
+        """
+        self.client.login(username=self.user.username, password=self.user_password)
+        self.assertEqual(self.client.get(reverse('toggle_like')).status_code, 405)
+        self.assertEqual(self.client.post(reverse('toggle_like'), {'vacation_id': 1000}).status_code, 404)
+        self.client.login(username=self.admin.username, password=self.admin_password)
+        response = self.client.post(reverse('toggle_like'), {'vacation_id': 1})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'error': 'Admins are not allowed to do this.'})
+
+    def test_like_is_a_single_upsert(self):
+        """
+        This test checks that liking a vacation writes the like with one
+        INSERT and no reads, and that liking it again is rejected without
+        raising an IntegrityError.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(Likes.objects.like(self.user, 1), 1)
+        statements = [query['sql'] for query in queries if 'SAVEPOINT' not in query['sql']]
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[0].startswith('INSERT'))
+        self.assertTrue(statements[1].startswith('UPDATE'))
+        self.assertIsNone(Likes.objects.like(self.user, 1))
+        self.assertIsNone(Likes.objects.like(self.user, 1000))
+        self.assertEqual(Likes.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(Vacation.objects.get(id=1).likes_count, 1)
+
+    def test_unlike_is_a_single_delete(self):
+        """
+        This test checks that unliking a vacation removes the like with one
+        DELETE, and that unliking it again reports that nothing was removed.
+        """
+        Likes.objects.like(self.user, 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(Likes.objects.unlike(self.user, 1), 0)
+        statements = [query['sql'] for query in queries if 'SAVEPOINT' not in query['sql']]
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[0].startswith('DELETE'))
+        self.assertIsNone(Likes.objects.unlike(self.user, 1))
+
+    def test_like_missing_or_invalid_vacation(self):
+        """
+        This test checks that liking a vacation that does not exist returns
+        a 404 response, and that an invalid or out of range vacation id
+        returns a 400.
+        """
+        self.client.login(username=self.user.username, password=self.user_password)
+        self.assertEqual(self.client.post(reverse('like_vacation'), {'vacation_id': 1000}).status_code, 404)
+        self.assertEqual(self.client.post(reverse('like_vacation'), {'vacation_id': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.post(reverse('unlike_vacation')).status_code, 400)
+        for view in ('like_vacation', 'unlike_vacation', 'toggle_like'):
+            for vacation_id in (10**30, -10**30, 2**63):
+                self.assertEqual(self.client.post(reverse(view), {'vacation_id': vacation_id}).status_code, 400, (view, vacation_id))
+        self.assertEqual(self.client.post(reverse('like_vacation'), {'vacation_id': 2**63 - 1}).status_code, 404)
+
+    def test_vacation_cards_are_cached(self):
+        """
+        This test checks that the shared part of each card is served from
+        the cache, and that saving the vacation or renaming its country
+        renders it again.
+        """
+        cache.clear()
+        self.client.login(username=self.user.username, password=self.user_password)
+        self.client.get(reverse('home'))
+        Vacation.objects.filter(id=1).update(description='Changed without saving')
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, 'Cherry blossoms and Tokyo adventures')
+        self.assertNotContains(response, 'Changed without saving')
+        vacation = Vacation.objects.get(id=1)
+        vacation.save()
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, 'Changed without saving')
+        self.country.country_name = 'Nippon'
+        self.country.save()
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, 'Nippon')
+
+    def test_deleting_vacation_clears_card_cache(self):
+        """
+        This test checks that deleting a vacation removes its cached card.
+        """
+        cache.clear()
+        self.client.login(username=self.user.username, password=self.user_password)
+        self.client.get(reverse('home'))
+        vacation = Vacation.objects.get(id=2)
+        self.assertIsNotNone(cache.get(vacation.card_cache_key()))
+        vacation.image = None
+        vacation.delete()
+        self.assertIsNone(cache.get(vacation.card_cache_key()))
+
+    def test_created_vacation_gets_image_derivatives(self):
+        """
+        This test checks that creating a vacation queues a job once the
+        transaction commits, that its card shows the original image until
+        the worker has generated resized WebP and JPEG copies, and that the
+        home page then offers them in a lazily loaded srcset.
+        """
+        image_io = io.BytesIO()
+        Image.new("RGB", (800, 400), color="blue").save(image_io, format="JPEG")
+        start = date.today() + timedelta(days=30)
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            self.client.login(username=self.admin.username, password=self.admin_password)
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                self.client.post(reverse('add_vacation'), {
+                    'country': 1,
+                    'description': 'Vacation with derivatives',
+                    'start_date': start.isoformat(),
+                    'end_date': (start + timedelta(days=7)).isoformat(),
+                    'price': '1000.00',
+                    'image': SimpleUploadedFile("large.jpg", image_io.getvalue(), content_type="image/jpeg"),
+                })
+                self.assertFalse(ImageJob.objects.exists())
+            self.assertEqual(len(callbacks), 1)
+            vacation = Vacation.objects.get(description='Vacation with derivatives')
+            self.assertEqual(vacation.image_variants, {})
+            self.assertEqual(vacation.image_jobs.get().status, ImageJob.Status.PENDING)
+            response = self.client.get(reverse('home'), {'cursor': encode_cursor([vacation.start_date, 0])})
+            self.assertContains(response, f'<img src="{vacation.image.url}" loading="lazy"')
+
+            out = io.StringIO()
+            call_command('process_image_jobs', once=True, stdout=out)
+            self.assertIn('Ran 1 image jobs, 0 failed.', out.getvalue())
+            self.assertEqual(vacation.image_jobs.get().status, ImageJob.Status.DONE)
+            vacation.refresh_from_db()
+            self.assertEqual(sorted(vacation.image_variants), ['jpeg', 'webp'])
+            self.assertEqual(sorted(vacation.image_variants['webp'], key=int), ['320', '640'])
+            for names in vacation.image_variants.values():
+                for width, name in names.items():
+                    with Image.open(os.path.join(media_root, name)) as derivative:
+                        self.assertEqual(derivative.width, int(width))
+            response = self.client.get(reverse('home'), {'cursor': encode_cursor([vacation.start_date, 0])})
+            self.assertContains(response, vacation.webp_srcset)
+            self.assertContains(response, 'loading="lazy"')
+            vacation.delete()
+            self.assertFalse(os.listdir(os.path.join(media_root, 'vacation_images', 'derivatives')))
+
+    def test_build_image_derivatives_command(self):
+        """
+        This test checks that the backfill command generates the resized
+        copies for existing vacations and reports images it cannot read.
+        """
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            os.makedirs(os.path.join(media_root, 'vacation_images'))
+            Image.new("RGB", (500, 300), color="green").save(os.path.join(media_root, 'vacation_images', 'japan.jpeg'))
+            out, err = io.StringIO(), io.StringIO()
+            call_command('build_image_derivatives', stdout=out, stderr=err)
+            self.assertEqual(Vacation.objects.get(id=1).image_variants['jpeg'], {'320': 'vacation_images/derivatives/japan-320w.jpeg'})
+            self.assertIn('Generated image derivatives for 1 vacations, 11 failed.', out.getvalue())
+            self.assertIn('Vacation 2', err.getvalue())
+
+    def test_changed_image_falls_back_until_processed(self):
+        """
+        This test checks that uploading a new image drops the resized copies
+        of the previous one, so the card shows the new original, and queues
+        a single job for it.
+        """
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            os.makedirs(os.path.join(media_root, 'vacation_images'))
+            Image.new("RGB", (500, 300), color="green").save(os.path.join(media_root, 'vacation_images', 'japan.jpeg'))
+            vacation = Vacation.objects.get(id=1)
+            generate_derivatives(vacation)
+            old_names = list(vacation.image_variants['jpeg'].values())
+            image_io = io.BytesIO()
+            Image.new("RGB", (700, 300), color="red").save(image_io, format="JPEG")
+            self.client.login(username=self.admin.username, password=self.admin_password)
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('update_vacation', args=[vacation.id]), {
+                    'country': vacation.country_id,
+                    'description': vacation.description,
+                    'start_date': vacation.start_date.isoformat(),
+                    'end_date': vacation.end_date.isoformat(),
+                    'price': vacation.price,
+                    'image': SimpleUploadedFile("new.jpg", image_io.getvalue(), content_type="image/jpeg"),
+                })
+            self.assertEqual(response.status_code, 302)
+            vacation.refresh_from_db()
+            self.assertEqual(vacation.image_variants, {})
+            self.assertFalse(any(os.path.exists(os.path.join(media_root, name)) for name in old_names))
+            self.assertEqual(vacation.image_jobs.filter(status=ImageJob.Status.PENDING).count(), 1)
+            call_command('process_image_jobs', once=True, stdout=io.StringIO())
+            vacation.refresh_from_db()
+            self.assertEqual(sorted(vacation.image_variants['jpeg'], key=int), ['320', '640'])
+
+    def test_failed_image_job_is_retried_then_failed(self):
+        """
+        This test checks that a job whose image cannot be read is retried
+        later until IMAGE_JOB_MAX_ATTEMPTS, then marked failed with its
+        error, that a job left running by a stopped worker is run again, and
+        that the admin can queue a job again.
+        """
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            job = ImageJob.objects.create(vacation_id=2)
+            with self.settings(IMAGE_JOB_MAX_ATTEMPTS=2), self.assertLogs('vacations_app.jobs', 'ERROR'):
+                err = io.StringIO()
+                call_command('process_image_jobs', once=True, stdout=io.StringIO(), stderr=err)
+                job.refresh_from_db()
+                self.assertEqual((job.status, job.attempts), (ImageJob.Status.PENDING, 1))
+                self.assertGreater(job.run_after, timezone.now())
+                self.assertIn('FileNotFoundError', job.last_error)
+                self.assertIn('Job', err.getvalue())
+
+                ImageJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+                call_command('process_image_jobs', once=True, stdout=io.StringIO(), stderr=io.StringIO())
+                job.refresh_from_db()
+                self.assertEqual((job.status, job.attempts), (ImageJob.Status.FAILED, 2))
+                self.assertIsNotNone(job.finished_at)
+
+            stale = ImageJob.objects.create(vacation_id=3, status=ImageJob.Status.RUNNING, started_at=timezone.now() - timedelta(hours=1))
+            with self.assertLogs('vacations_app.jobs', 'ERROR'):
+                call_command('process_image_jobs', once=True, max_jobs=1, stdout=io.StringIO(), stderr=io.StringIO())
+            stale.refresh_from_db()
+            self.assertEqual(stale.attempts, 1)
+
+            self.client.login(username=self.admin.username, password=self.admin_password)
+            response = self.client.get(reverse('admin:vacations_app_imagejob_changelist'), {'status': 'failed'})
+            self.assertContains(response, 'FileNotFoundError')
+            self.client.post(reverse('admin:vacations_app_imagejob_changelist'), {'action': 'retry', '_selected_action': [job.pk]})
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts, job.last_error), (ImageJob.Status.PENDING, 0, ''))
+
+    def test_api_lists_vacations(self):
+        """
+        This test checks that the vacations API requires a login and returns
+        cursor paginated vacations with their country and like count.
+        """
+        self.assertEqual(self.client.get(reverse('api_vacations')).status_code, 403)
+        Likes.objects.like(self.user, 1)
+        self.client.login(username=self.user.username, password=self.user_password)
+        response = self.client.get(reverse('api_vacations'), {'page_size': 5})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['results']), 5)
+        self.assertIsNotNone(data['next'])
+        results = data['results']
+        while data['next']:
+            data = self.client.get(data['next']).json()
+            results += data['results']
+        self.assertEqual(
+            [vacation['id'] for vacation in results],
+            list(Vacation.objects.order_by('start_date', 'id').values_list('id', flat=True)),
+        )
+        liked = next(vacation for vacation in results if vacation['id'] == 1)
+        self.assertEqual(liked['country'], self.country.country_name)
+        self.assertEqual(liked['likes_count'], 1)
+
+    def test_api_filters(self):
+        """
+        This test checks the country, price and date filters of the
+        vacations API, and that an invalid filter returns a 400 response.
+        """
+        self.client.login(username=self.user.username, password=self.user_password)
+        url = reverse('api_vacations')
+        by_name = self.client.get(url, {'country': self.country.country_name.upper()}).json()['results']
+        by_id = self.client.get(url, {'country': self.country.id}).json()['results']
+        self.assertEqual(by_name, by_id)
+        self.assertEqual({vacation['country'] for vacation in by_name}, {self.country.country_name})
+        results = self.client.get(url, {'min_price': '2000', 'max_price': '2500'}).json()['results']
+        self.assertEqual(
+            [vacation['id'] for vacation in results],
+            list(Vacation.objects.filter(price__gte=2000, price__lte=2500).values_list('id', flat=True)),
+        )
+        results = self.client.get(url, {'start_after': '2025-10-01', 'end_before': '2025-12-31'}).json()['results']
+        self.assertEqual(
+            [vacation['id'] for vacation in results],
+            list(Vacation.objects.filter(start_date__gte='2025-10-01', end_date__lte='2025-12-31').values_list('id', flat=True)),
+        )
+        self.assertEqual(self.client.get(url, {'min_price': 'cheap'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'country': 10**30}).status_code, 400)
+
+    def test_api_conditional_get(self):
+        """
+        This test checks that the vacations API answers with a 304 response
+        while the catalog is unchanged, and with a new ETag after a like.
+        """
+        self.client.login(username=self.user.username, password=self.user_password)
+        url = reverse('api_vacations')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertNotEqual(self.client.get(url, {'page_size': 5})['ETag'], etag)
+        Likes.objects.like(self.user, 1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_benchmark_queries_command(self):
+        """
+        This test checks that the query benchmark reports every hot query
+        and rolls back the data it generates.
+        """
+        out = io.StringIO()
+        call_command('benchmark_queries', vacations=50, likes=300, users=20, countries=5, repeat=1, stdout=out)
+        self.assertIn('Generated 50 vacations, 20 users and 300 likes', out.getvalue())
+        self.assertIn('home feed, deep page', out.getvalue())
+        self.assertIn('home feed, most liked first', out.getvalue())
+        self.assertIn('search, best match first', out.getvalue())
+        self.assertIn('likes of a vacation', out.getvalue())
+        self.assertEqual(Vacation.objects.count(), 12)
+        self.assertFalse(User.objects.filter(username__startswith='benchmark').exists())
+
+    def test_import_vacations_command(self):
+        """
+        This test checks that the import command creates the valid rows of
+        a CSV file and reports every rejected row with its line number.
+
+        The file has two valid rows, then a row with an unknown country, a
+        duplicate of an existing vacation, a duplicate of an earlier row, a
+        start date in the past and a price that is not a number.
+        """
+        start = date.today() + timedelta(days=30)
+        existing = Vacation.objects.create(
+            country=self.country,
+            description='Existing vacation package',
+            start_date=start + timedelta(days=100),
+            end_date=start + timedelta(days=107),
+            price='1000.00',
+            image='vacation_images/japan.jpeg',
+        )
+        rows = [
+            [self.country.country_name, 'Imported vacation package', start, start + timedelta(days=7), '1200.50', 'vacation_images/rome.jpg'],
+            [self.country.id, 'Another imported vacation', start + timedelta(days=1), start + timedelta(days=8), '900', 'vacation_images/rome.jpg'],
+            ['Atlantis', 'Imported vacation package', start, start + timedelta(days=7), '1000', 'vacation_images/rome.jpg'],
+            [self.country.id, 'Imported vacation package', existing.start_date, existing.end_date, '1000', 'vacation_images/rome.jpg'],
+            [self.country.country_name, 'Imported vacation package', start, start + timedelta(days=7), '1000', 'vacation_images/rome.jpg'],
+            [self.country.id, 'Imported vacation package', date.today() - timedelta(days=3), start, '1000', 'vacation_images/rome.jpg'],
+            [self.country.id, 'Imported vacation package', start, start + timedelta(days=9), 'cheap', 'vacation_images/rome.jpg'],
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'vacations.csv')
+            errors = os.path.join(directory, 'errors.csv')
+            with open(path, 'w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(['country', 'description', 'start_date', 'end_date', 'price', 'image'])
+                writer.writerows(rows)
+            count = Vacation.objects.count()
+            out = io.StringIO()
+            with CaptureQueriesContext(connection) as queries:
+                call_command('import_vacations', path, errors=errors, stdout=out)
+            with open(errors, newline='') as file:
+                report = list(csv.DictReader(file))
+        self.assertIn('Imported 2 vacations, rejected 5 rows.', out.getvalue())
+        self.assertEqual(Vacation.objects.count(), count + 2)
+        self.assertTrue(Vacation.objects.filter(description='Another imported vacation', price=900).exists())
+        self.assertEqual([int(rejection['line']) for rejection in report], [4, 5, 6, 7, 8])
+        self.assertEqual(report[0]['error'], 'Country does not exist.')
+        self.assertIn('already exists', report[1]['error'])
+        self.assertIn('already exists', report[2]['error'])
+        self.assertEqual(report[3]['error'], 'Start date must be in the future.')
+        self.assertEqual(report[4]['error'], 'Price must be a number.')
+        self.assertEqual(json.loads(report[0]['row'])['country'], 'Atlantis')
+        # One batch: resolve the countries, probe for duplicates, insert.
+        statements = [query['sql'] for query in queries.captured_queries if 'SAVEPOINT' not in query['sql']]
+        self.assertEqual(len(statements), 3)
+
+    def test_import_vacations_jsonl_in_batches(self):
+        """
+        This test checks that JSON Lines files are imported in batches, that
+        a price of 0 is accepted, and that lines that are not JSON objects
+        or have a price that is not a number are rejected without stopping
+        the import.
+        """
+        start = date.today() + timedelta(days=60)
+        lines = [
+            json.dumps({
+                'country': self.country.country_name,
+                'description': f'Imported vacation number {i}',
+                'start_date': str(start + timedelta(days=i)),
+                'end_date': str(start + timedelta(days=i + 5)),
+                'price': price,
+                'image': 'vacation_images/rome.jpg',
+            })
+            for i, price in enumerate([1000, 0, 1002, 'NaN', 1004, 'sNaN', 1006])
+        ]
+        lines.insert(2, 'not json')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'vacations.jsonl')
+            with open(path, 'w') as file:
+                file.write('\n'.join(lines) + '\n')
+            out, err = io.StringIO(), io.StringIO()
+            call_command('import_vacations', path, batch_size=2, stdout=out, stderr=err)
+        self.assertIn('Imported 5 vacations, rejected 3 rows.', out.getvalue())
+        self.assertIn('3,Line is not a JSON object.', err.getvalue())
+        self.assertIn('5,Price must be a number.', err.getvalue())
+        self.assertIn('7,Price must be a number.', err.getvalue())
+        self.assertEqual(Vacation.objects.filter(description__startswith='Imported vacation number').count(), 5)
+        self.assertEqual(Vacation.objects.get(description='Imported vacation number 1').price, 0)
+
+    def test_export_streams_vacations(self):
+        """
+        This test checks that staff can download the catalog as a streamed
+        CSV or JSON Lines file with the country names and like counts, and
+        that other users cannot.
+        """
+        Likes.objects.like(self.user, 1)
+        self.client.login(username=self.user.username, password=self.user_password)  # regular user
+        self.assertEqual(self.client.get(reverse('export_vacations')).status_code, 403)
+        self.client.login(username=self.admin.username, password=self.admin_password)  # admin user
+        response = self.client.get(reverse('export_vacations'))
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(len(rows), Vacation.objects.count())
+        self.assertEqual(rows[0]['id'], '1')
+        self.assertEqual(rows[0]['country'], Vacation.objects.get(id=1).country.country_name)
+        self.assertEqual(rows[0]['likes_count'], '1')
+        response = self.client.get(reverse('export_vacations'), {'format': 'jsonl'})
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(lines), Vacation.objects.count())
+        self.assertEqual(lines[0]['likes_count'], 1)
+        self.assertEqual(self.client.get(reverse('export_vacations'), {'format': 'xml'}).status_code, 400)
+
+    def test_export_since_timestamp(self):
+        """
+        This test checks that an incremental export only holds the vacations
+        edited, liked or unliked after the given timestamp.
+        """
+        self.client.login(username=self.admin.username, password=self.admin_password)  # admin user
+        since = self.client.get(reverse('export_vacations'))['X-Export-Timestamp']
+        Likes.objects.like(self.user, 2)
+        Vacation.objects.filter(id=3).update(updated_at=timezone.now())
+        response = self.client.get(reverse('export_vacations'), {'format': 'jsonl', 'since': since})
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([line['id'] for line in lines], [2, 3])
+        self.assertEqual(self.client.get(reverse('export_vacations'), {'since': 'yesterday'}).status_code, 400)
+
+    async def test_async_views_under_asgi(self):
+        """
+        This test checks that the home feed and the like endpoints work
+        when served by the ASGI handler, where they run on the event loop.
+        """
+        await self.async_client.alogin(username=self.user.username, password=self.user_password)
+        response = await self.async_client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['vacations']), await Vacation.objects.acount())
+        response = await self.async_client.post(reverse('toggle_like'), {'vacation_id': 1})
+        self.assertEqual(response.json(), {'liked': True, 'likes_count': 1})
+        response = await self.async_client.post(reverse('unlike_vacation'), {'vacation_id': 1})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(await Likes.objects.filter(user=self.user).aexists())
+        response = await self.async_client.post(reverse('like_vacation'), {'vacation_id': 999})
+        self.assertEqual(response.status_code, 404)
+        await self.async_client.alogout()
+        response = await self.async_client.get(reverse('home'))
+        self.assertEqual(response.status_code, 302)
+
+    async def test_export_streams_under_asgi(self):
+        """
+        This test checks that the export is streamed from an async iterator
+        when served by the ASGI handler, and holds the same rows.
+        """
+        await self.async_client.alogin(username=self.admin.username, password=self.admin_password)
+        for file_format in ('csv', 'jsonl'):
+            response = await self.async_client.get(reverse('export_vacations'), {'format': file_format})
+            self.assertTrue(response.is_async)
+            content = b''.join([chunk async for chunk in response.streaming_content]).decode()
+            self.assertEqual(len(content.splitlines()), await Vacation.objects.acount() + (file_format == 'csv'))
+
+    @skipUnless(jinja2, "jinja2 is not installed")
+    def test_jinja2_feed_matches_django_templates(self):
+        """
+        This test checks that the Jinja2 versions of the home page templates
+        render the same page as the Django templates, for a regular user
+        and for an admin.
+        """
+        for username, password in [(self.user.username, self.user_password), (self.admin.username, self.admin_password)]:
+            self.client.login(username=username, password=password)
+            pages = {}
+            for engine in ('django', 'jinja2'):
+                cache.clear()
+                with self.settings(FEED_TEMPLATE_ENGINE=engine):
+                    response = self.client.get(reverse('home'))
+                self.assertEqual(response.status_code, 200)
+                content = re.sub(r'name="csrfmiddlewaretoken" value="[^"]+"', '', response.content.decode())
+                pages[engine] = ' '.join(content.split())
+            self.assertEqual(pages['django'], pages['jinja2'])
+
+    def test_benchmark_templates_command(self):
+        """
+        This test checks that the rendering benchmark reports every engine
+        for each page size.
+        """
+        out = io.StringIO()
+        cache.set('unrelated', 'kept')
+        call_command('benchmark_templates', cards=[3, 7], repeat=1, stdout=out)
+        self.assertEqual(cache.get('unrelated'), 'kept')
+        lines = out.getvalue().splitlines()[1:]
+        self.assertEqual(len(lines), 4 if jinja2 else 2)
+        self.assertEqual(lines[0].split()[:2], ['django', '3'])
+
+    def test_home_popular_sort(self):
+        """
+        This test checks that ?sort=popular orders the feed by like count,
+        most liked first, and that the cards endpoint keeps the sort while
+        paging through every vacation.
+        """
+        self.create_vacations(40)
+        counts = {1: 5, 7: 9, 30: 2}
+        for vacation_id, likes_count in counts.items():
+            Vacation.objects.filter(id=vacation_id).update(likes_count=likes_count)
+        self.client.login(username=self.user.username, password=self.user_password)
+        response = self.client.get(reverse('home'), {'sort': 'popular'})
+        self.assertEqual(response.context['sort'], 'popular')
+        seen = [vacation.id for vacation in response.context['vacations']]
+        self.assertEqual(seen[:3], [7, 1, 30])
+        self.assertContains(response, 'sort=popular&amp;cursor=')
+        cursor = response.context['next_cursor']
+        while cursor:
+            response = self.client.get(reverse('vacation_cards'), {'sort': 'popular', 'cursor': cursor})
+            seen += [vacation.id for vacation in response.context['vacations']]
+            cursor = response.context['next_cursor']
+        self.assertEqual(seen, list(Vacation.objects.order_by('-likes_count', 'id').values_list('id', flat=True)))
+        response = self.client.get(reverse('home'), {'sort': 'cheapest'})
+        self.assertEqual(response.context['sort'], 'date')
+
+    def test_home_search(self):
+        """
+        This test checks that the search box filters the feed by every word
+        of the search text, in the description or the country name, keeps
+        the search in the sort and next page links, and defaults to the best
+        match sort.
+        """
+        self.create_vacations(30)
+        Vacation.objects.filter(id=3).update(description='Sunny beach resort with a private pool')
+        self.client.login(username=self.user.username, password=self.user_password)
+        response = self.client.get(reverse('home'), {'q': 'beach POOL'})
+        self.assertEqual([vacation.id for vacation in response.context['vacations']], [3])
+        self.assertEqual(response.context['sort'], 'relevance')
+        self.assertContains(response, 'value="beach POOL"')
+        self.assertContains(response, '?q=beach+POOL&amp;sort=popular')
+        response = self.client.get(reverse('home'), {'q': self.country.country_name, 'sort': 'date'})
+        expected = list(Vacation.objects.filter(country=self.country).order_by('start_date', 'id').values_list('id', flat=True))
+        seen = [vacation.id for vacation in response.context['vacations']]
+        cursor = response.context['next_cursor']
+        self.assertIn(f'q={self.country.country_name}', response.context['next_query'])
+        while cursor:
+            response = self.client.get(reverse('vacation_cards'), {'q': self.country.country_name, 'sort': 'date', 'cursor': cursor})
+            seen += [vacation.id for vacation in response.context['vacations']]
+            cursor = response.context['next_cursor']
+        self.assertEqual(seen, expected)
+        response = self.client.get(reverse('home'), {'q': 'atlantis'})
+        self.assertContains(response, 'No vacations match')
+        response = self.client.get(reverse('home'), {'sort': 'relevance'})
+        self.assertEqual(response.context['sort'], 'date')
+
+    @skipUnless(connection.vendor == 'postgresql', "ranks are only computed on PostgreSQL")
+    def test_home_search_pages_through_tied_ranks(self):
+        """
+        This test checks that paging through search results sorted by best
+        match returns every match exactly once, in rank order, when many of
+        them share a rank that is not exactly representable.
+        """
+        self.create_vacations(60)
+        descriptions = ['Sunny beach resort', 'Quiet beach house by the beach', 'Mountain lodge near a beach town']
+        for index, vacation_id in enumerate(Vacation.objects.filter(country=self.country).values_list('id', flat=True)):
+            Vacation.objects.filter(id=vacation_id).update(description=descriptions[index % 3])
+        Vacation.objects.all().update_search_vectors()
+        expected = list(Vacation.objects.search('beach').order_by('-rank', 'id').values_list('id', flat=True))
+        self.client.login(username=self.user.username, password=self.user_password)
+        response = self.client.get(reverse('home'), {'q': 'beach'})
+        seen = [vacation.id for vacation in response.context['vacations']]
+        cursor = response.context['next_cursor']
+        while cursor:
+            response = self.client.get(reverse('vacation_cards'), {'q': 'beach', 'cursor': cursor})
+            seen += [vacation.id for vacation in response.context['vacations']]
+            cursor = response.context['next_cursor']
+        self.assertEqual(len(expected), 60)
+        self.assertEqual(seen, expected)
+
+    def test_home_facet_filters(self):
+        """
+        This test checks that the home feed filters by country, price band
+        and date window, and that each facet counts the vacations matching
+        every filter except its own.
+        """
+        self.create_vacations(10)
+        other = Country.objects.exclude(id=self.country.id).first()
+        Vacation.objects.filter(id__in=[2, 4]).update(price='3000.00')
+        self.client.login(username=self.user.username, password=self.user_password)
+        response = self.client.get(reverse('home'), {'country': self.country.id, 'price': '1000-2500'})
+        vacations = Vacation.objects.filter(country=self.country, price__gte=1000, price__lt=2500)
+        self.assertEqual(sorted(vacation.id for vacation in response.context['vacations']), sorted(vacations.values_list('id', flat=True)))
+        countries = {option[0]: option for option in response.context['country_options']}
+        self.assertEqual(countries[self.country.id][2], vacations.count())
+        self.assertTrue(countries[self.country.id][3])
+        self.assertEqual(countries[other.id][2], Vacation.objects.filter(country=other, price__gte=1000, price__lt=2500).count())
+        bands = {option[0]: option[2] for option in response.context['price_options']}
+        self.assertEqual(bands['2500-5000'], Vacation.objects.filter(country=self.country, price__gte=2500, price__lt=5000).count())
+        self.assertEqual(sum(bands.values()), Vacation.objects.filter(country=self.country).count())
+        self.assertContains(response, f'<option value="{self.country.id}" selected>')
+
+        start = date.today() + timedelta(days=32)
+        response = self.client.get(reverse('home'), {'start_after': start, 'end_before': start + timedelta(days=10), 'country': 'not a number'})
+        expected = Vacation.objects.filter(start_date__gte=start, end_date__lte=start + timedelta(days=10))
+        self.assertEqual(sorted(vacation.id for vacation in response.context['vacations']), sorted(expected.values_list('id', flat=True)))
+        self.assertEqual(sum(option[2] for option in response.context['country_options']), expected.count())
+        self.assertEqual(response.context['filters'], {'start_after': start, 'end_before': start + timedelta(days=10)})
+        self.assertIn('start_after=', response.context['sort_options'][1][2])
+
+        for country in (10**30, -10**30, 0):
+            response = self.client.get(reverse('home'), {'country': country})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['filters'], {})
+        response = self.client.get(reverse('vacation_cards'), {'country': 10**30})
+        self.assertEqual(response.status_code, 200)
+
+    def test_home_facets_cost_one_query(self):
+        """
+        This test checks that the facet counts add the same single query to
+        the home page whatever filters are applied.
+        """
+        self.client.login(username=self.user.username, password=self.user_password)
+        self.client.get(reverse('home'))
+        with CaptureQueriesContext(connection) as unfiltered:
+            self.client.get(reverse('home'))
+        with CaptureQueriesContext(connection) as filtered:
+            self.client.get(reverse('home'), {'country': self.country.id, 'price': '5000-up', 'start_after': '2020-01-01'})
+        with CaptureQueriesContext(connection) as cards:
+            self.client.get(reverse('vacation_cards'))
+        self.assertEqual(len(unfiltered), len(filtered))
+        self.assertEqual(len(unfiltered), len(cards) + 1)
+        self.assertEqual(sum('GROUP BY' in query['sql'] for query in filtered.captured_queries), 1)
+
+    def test_request_timing_header_and_log(self):
+        """
+        This test checks that every response, from async and sync views,
+        gets a Server-Timing header counting the queries the request ran,
+        and that the timings are logged under the URL name.
+        """
+        self.client.login(username=self.user.username, password=self.user_password)
+        with self.assertLogs('vacations_project.requests', 'INFO') as logs, CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('home'))
+        match = re.match(r'db;dur=[\d.]+;desc="(\d+) queries", tpl;dur=([\d.]+), total;dur=[\d.]+$', response['Server-Timing'])
+        self.assertIsNotNone(match)
+        self.assertEqual(int(match.group(1)), len(queries))
+        self.assertGreater(float(match.group(2)), 0)
+        self.assertEqual(logs.records[-1].levelname, 'INFO')
+        self.assertIn(f'url_name=home method=GET status=200 queries={len(queries)} ', logs.output[-1])
+        self.assertEqual(logs.records[-1].timings['queries'], len(queries))
+
+        response = self.client.get(reverse('api_vacations'))
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries"')
+
+    def test_request_query_warning_threshold(self):
+        """
+        This test checks that requests running more queries than
+        REQUEST_QUERY_WARNING_THRESHOLD are logged as warnings.
+        """
+        self.client.login(username=self.user.username, password=self.user_password)
+        with self.settings(REQUEST_QUERY_WARNING_THRESHOLD=1), self.assertLogs('vacations_project.requests', 'WARNING') as logs:
+            self.client.get(reverse('home'))
+        self.assertIn('url_name=home', logs.output[0])
+        with self.settings(REQUEST_QUERY_WARNING_THRESHOLD=None), self.assertNoLogs('vacations_project.requests', 'WARNING'):
+            self.client.get(reverse('home'))
         
 # Create your tests here.
+
+
+class ServerBenchmarkTestCase(LiveServerTestCase):
+    def test_benchmark_servers_command(self):
+        """
+        This test checks that the server benchmark logs in, loads the home
+        feed of a running server with slow clients and reports the results,
+        and that it leaves no user behind.
+        """
+        out = io.StringIO()
+        users = User.objects.count()
+        call_command('benchmark_servers', wsgi_url=self.live_server_url, requests=6, concurrency=3, send_delay=0.01, stdout=out)
+        wsgi = out.getvalue().splitlines()[1].split()
+        self.assertEqual(wsgi[:3], ['wsgi', '6', '0'])
+        self.assertEqual(User.objects.count(), users)
+        with self.assertRaises(CommandError):
+            call_command('benchmark_servers', wsgi_url=self.live_server_url, username='nobody@example.com')
+        with self.assertRaises(CommandError):
+            call_command('benchmark_servers')
+
+
+class LoadRunnerTestCase(SimpleTestCase):
+    def test_dropped_connections_count_as_errors(self):
+        """
+        This test checks that run_load counts a connection the server closes
+        without answering, or answers with garbage, as an error instead of
+        failing.
+        """
+        async def load():
+            replies = iter([b'', b'garbage\r\n'] * 2)
+
+            async def handle(reader, writer):
+                await reader.readuntil(b'\r\n\r\n')
+                writer.write(next(replies))
+                writer.close()
+
+            server = await asyncio.start_server(handle, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                return await run_load(f'http://127.0.0.1:{port}/', 4, 2)
+
+        result = asyncio.run(load())
+        self.assertEqual((result.requests, result.errors), (4, 4))
+
+
+class LoadTestTestCase(LiveServerTestCase):
+    def test_seed_scale_and_load_test_commands(self):
+        """
+        This test checks that seed_scale creates users who can log in, and
+        that load_test runs every scenario through the test client and
+        against a running server, saves its results and compares them with
+        a saved baseline.
+        """
+        out = io.StringIO()
+        with self.settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+            call_command('seed_scale', countries=3, vacations=40, users=4, likes=60, password='Secret123!', stdout=out)
+            self.assertIn('Created 3 countries, 40 vacations, 4 users and 60 likes', out.getvalue())
+            self.assertEqual(Likes.objects.count(), 60)
+            self.assertEqual(sum(Vacation.objects.values_list('likes_count', flat=True)), 60)
+
+            with tempfile.TemporaryDirectory() as directory:
+                baseline = os.path.join(directory, 'baseline.json')
+                out = io.StringIO()
+                call_command('load_test', requests=6, concurrency=2, password='Secret123!', save=baseline, stdout=out)
+                rows = {line.split()[0]: line.split() for line in out.getvalue().splitlines()[1:4]}
+                self.assertEqual(set(rows), {'home', 'like', 'login'})
+                self.assertTrue(all(row[1] == '6' for row in rows.values()))
+                # Concurrent likes can hit a table lock on the in-memory
+                # SQLite test database, so only the other scenarios must be
+                # free of errors.
+                self.assertEqual(rows['home'][2], '0')
+                self.assertEqual(rows['login'][2], '0')
+                with open(baseline) as baseline_file:
+                    saved = json.load(baseline_file)
+                self.assertEqual(saved['target'], 'test client')
+                self.assertEqual(saved['results']['home']['requests'], 6)
+
+                out = io.StringIO()
+                with self.settings(AUTH_THROTTLE_RATES={}):
+                    call_command('load_test', url=self.live_server_url, scenario=['home', 'like'], requests=4, concurrency=2, password='Secret123!', compare=baseline, stdout=out)
+                lines = out.getvalue().splitlines()
+                self.assertEqual(lines[1].split()[:3], ['home', '4', '0'])
+                self.assertEqual(lines[2].split()[:2], ['like', '4'])
+                self.assertIn('Compared with', out.getvalue())
+                self.assertRegex(out.getvalue(), r'\nhome +[+-]\d+\.\d%')
+            with self.assertRaises(CommandError):
+                call_command('load_test', password='wrong', scenario=['home'], stdout=io.StringIO())
+            with self.assertRaises(CommandError):
+                call_command('load_test', prefix='nobody', stdout=io.StringIO())
+
+
+class ConnectionBenchmarkTestCase(TransactionTestCase):
+    def test_benchmark_connections_command(self):
+        """
+        This test checks that the connection benchmark measures both
+        connection modes and restores the connection settings afterwards.
+        """
+        settings_dict = dict(connection.settings_dict)
+        out = io.StringIO()
+        call_command('benchmark_connections', requests=5, stdout=out)
+        self.assertIn('new connection per request', out.getvalue())
+        self.assertIn('persistent connection', out.getvalue())
+        self.assertEqual(connection.settings_dict, settings_dict)
+
+
+class ProductionSettingsTestCase(SimpleTestCase):
+    def load_settings(self, **environ):
+        """
+        Import the production settings with the given environment variables
+        and return the module.
+        """
+        environ = {'DJANGO_SECRET_KEY': 'secret', 'DATABASE_PASSWORD': 'password', **environ}
+        with mock.patch.dict(os.environ, environ, clear=True):
+            import vacations_project.settings_production as production
+            return importlib.reload(production)
+
+    def test_persistent_connections_by_default(self):
+        """
+        This test checks that the production settings read the database
+        from the environment and keep connections open with health checks.
+        """
+        production = self.load_settings(DATABASE_HOST='db.internal', DATABASE_CONN_MAX_AGE='120', DJANGO_ALLOWED_HOSTS='a.com, b.com')
+        database = production.DATABASES['default']
+        self.assertEqual(database['HOST'], 'db.internal')
+        self.assertEqual(database['PASSWORD'], 'password')
+        self.assertEqual(database['CONN_MAX_AGE'], 120)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        self.assertNotIn('OPTIONS', database)
+        self.assertFalse(production.DEBUG)
+        self.assertEqual(production.ALLOWED_HOSTS, ['a.com', 'b.com'])
+
+    def test_connection_pool(self):
+        """
+        This test checks that DATABASE_POOL switches to the psycopg pool,
+        which cannot be combined with persistent connections, and that the
+        secret key is required.
+        """
+        database = self.load_settings(DATABASE_POOL='1', DATABASE_POOL_MAX_SIZE='20').DATABASES['default']
+        self.assertEqual(database['OPTIONS']['pool']['max_size'], 20)
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        with self.assertRaises(ImproperlyConfigured):
+            self.load_settings(DJANGO_SECRET_KEY='')
+        with mock.patch.dict(os.environ, {'DATABASE_PASSWORD': 'password'}, clear=True):
+            with self.assertRaises(ImproperlyConfigured):
+                importlib.reload(sys.modules['vacations_project.settings_production'])
+
+
+class StaticFilesTestCase(SimpleTestCase):
+    def test_collectstatic_hashes_and_compresses(self):
+        """
+        This test checks that collectstatic with the production storage
+        writes hashed file names, precompressed siblings of the stylesheet
+        and a stylesheet pointing at the hashed background images.
+        """
+        storages = {
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'vacations_project.storage.CompressedManifestStaticFilesStorage'},
+        }
+        with tempfile.TemporaryDirectory() as static_root, self.settings(STATIC_ROOT=static_root, STORAGES=storages):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            with open(os.path.join(static_root, 'staticfiles.json')) as manifest_file:
+                manifest = json.load(manifest_file)['paths']
+            stylesheet = os.path.join(static_root, manifest['css/style.css'])
+            self.assertNotEqual(manifest['css/style.css'], 'css/style.css')
+            with gzip.open(stylesheet + '.gz') as compressed, open(stylesheet, 'rb') as original:
+                self.assertEqual(compressed.read(), original.read())
+            with open(stylesheet) as original:
+                css = original.read()
+            self.assertIn(manifest['images/vacation-bg-1920w.webp'].split('/')[-1], css)
+            self.assertNotIn('vacation-bg-1920w.jpg', css)
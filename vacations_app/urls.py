@@ -1,11 +1,16 @@
 from django.urls import path
-from .views import HomeView, like_vacation, unlike_vacation, CreateVacationView, Vacation, DeleteVacationView, UpdateVacationView
+from .api import VacationListAPIView
+from .views import HomeView, VacationCardsView, like_vacation, unlike_vacation, toggle_like, CreateVacationView, ExportVacationsView, Vacation, DeleteVacationView, UpdateVacationView
 
 
 urlpatterns = [path('', HomeView.as_view(), name='home'),
+    path('cards/', VacationCardsView.as_view(), name='vacation_cards'),
     path('like/', like_vacation, name='like_vacation'),
+    path('like/toggle/', toggle_like, name='toggle_like'),
     path('unlike/', unlike_vacation, name='unlike_vacation'),
     path('add/', CreateVacationView.as_view(), name='add_vacation'),
     path('delete/<int:pk>/', DeleteVacationView.as_view(), name='delete_vacation'),
     path('update/<int:pk>/', UpdateVacationView.as_view(), name='update_vacation'),
+    path('export/', ExportVacationsView.as_view(), name='export_vacations'),
+    path('api/vacations/', VacationListAPIView.as_view(), name='api_vacations'),
     ]
\ No newline at end of file
@@ -1,17 +1,30 @@
 from vacations_app.models import Vacation, Likes
-from .froms import VacationForm, CountryForm, UpdateVacationForm
+from django.db.models import QuerySet
+from .froms import VacationForm, CountryForm, UpdateVacationForm, VacationFilterForm
+from .facets import build_facets, facet_rows, price_band_filter
+from .pagination import apaginate_keyset
+from .images import CARD_SIZES
+from .jobs import discard_variants, enqueue_image_job
+from .exporting import astream_csv, astream_jsonl, export_queryset, stream_csv, stream_jsonl
 
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.contrib.auth.models import User
 from django.shortcuts import render, redirect
-from django.views.generic import ListView, CreateView, DeleteView, UpdateView
+from django.views.generic import ListView, CreateView, DeleteView, UpdateView, View
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.views import redirect_to_login
 from django.urls import reverse_lazy
 from datetime import datetime
-from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.core.exceptions import BadRequest, ValidationError
 from typing import Dict, Any
 from django.contrib import messages
 from django.forms import BaseForm
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 class StaffuserRequiredMixin:
     def dispatch(self, request, *args, **kwargs):
@@ -29,24 +42,182 @@ class StaffuserRequiredMixin:
         
         # Proceed with the standard dispatch method for staff members
         return super().dispatch(request, *args, **kwargs)
-class HomeView(LoginRequiredMixin, ListView):
+class AsyncLoginRequiredMixin:
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Redirect anonymous users to the login page, like LoginRequiredMixin,
+        for views whose handlers are async.
+
+        The user is loaded with request.auser(), since touching request.user
+        would run a blocking query on the event loop, and then stored on
+        request.user so the rest of the request reuses it.
+        """
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        request.user = user
+        return await super().dispatch(request, *args, **kwargs)
+
+class HomeView(AsyncLoginRequiredMixin, ListView):
     template_name = 'home.html'
     model = Vacation
     context_object_name = 'vacations'
+    # The orderings the feed can be sorted by, each ending with a unique
+    # field for keyset pagination and backed by an index (see Vacation.Meta).
+    orderings = {
+        'date': ('start_date', 'id'),
+        'popular': ('-likes_count', 'id'),
+        'relevance': ('-rank', 'id'),
+    }
+    sort_labels = {
+        'date': 'Soonest',
+        'popular': 'Most liked',
+        'relevance': 'Best match',
+    }
+    page_size = 24
+    show_facets = True
+
+    @property
+    def template_engine(self) -> str:
+        """
+        Return the name of the engine rendering the feed (see
+        FEED_TEMPLATE_ENGINE), which has Django and Jinja2 templates.
+        """
+        return settings.FEED_TEMPLATE_ENGINE
+
+    def get_search(self) -> str:
+        """
+        Return the text searched for with the 'q' query parameter, or an
+        empty string.
+        """
+        return self.request.GET.get('q', '').strip()[:200]
+
+    def get_sort(self) -> str:
+        """
+        Return the sort requested with the 'sort' query parameter: 'date'
+        (soonest first), 'popular' (most liked first) or, when searching,
+        'relevance' (best match first). Searches default to 'relevance' and
+        everything else to 'date'.
+        """
+        searching = bool(self.get_search())
+        sort = self.request.GET.get('sort')
+        if sort in self.orderings and (sort != 'relevance' or searching):
+            return sort
+        return 'relevance' if searching else 'date'
+
+    def get_ordering(self) -> tuple:
+        """
+        Return the ordering of the requested sort.
+
+        The popular sort orders by the likes_count column, which like() and
+        unlike() keep up to date and the recount_likes job corrects, so it
+        costs the same as the date sort instead of counting Likes rows.
+        """
+        return self.orderings[self.get_sort()]
+
+    def get_queryset(self) -> QuerySet:
+        """
+        Return the vacations for the home feed in a single query (see
+        VacationQuerySet.for_feed), so the number of queries stays constant
+        no matter how many vacations are shown, limited to the ones matching
+        the search text if there is one.
+        """
+        queryset = self.get_filtered_queryset(Vacation.objects.for_feed(self.request.user))
+        filters = self.get_filters()
+        if 'country' in filters:
+            queryset = queryset.filter_by(country=filters['country'])
+        if 'price' in filters:
+            queryset = queryset.filter(price_band_filter(filters['price']))
+        return queryset.order_by(*self.get_ordering())
+
+    def get_filters(self) -> Dict[str, Any]:
+        """
+        Return the valid filters given in the query string (see
+        VacationFilterForm).
+        """
+        if not hasattr(self, '_filters'):
+            self._filters = VacationFilterForm(self.request.GET).filters()
+        return self._filters
+
+    def get_filtered_queryset(self, queryset: QuerySet) -> QuerySet:
+        """
+        Apply the search and the date window to ``queryset``: every filter
+        but the faceted country and price band ones.
+        """
+        if self.get_search():
+            queryset = queryset.search(self.get_search())
+        filters = self.get_filters()
+        return queryset.filter_by(start_after=filters.get('start_after'), end_before=filters.get('end_before'))
+
+    def page_query(self, **params: Any) -> str:
+        """
+        Return the query string of the current page without its cursor and
+        with ``params`` set, for links that keep the current search and sort.
+        """
+        query = self.request.GET.copy()
+        query.pop('cursor', None)
+        for key, value in params.items():
+            query[key] = value
+        return query.urlencode()
+
+    async def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        """
+        Fetch one page of vacations with the async ORM and render it.
+
+        Under ASGI the page query no longer holds a worker thread while it
+        waits for the database. Pages are keyed on the ordering fields of the
+        last vacation shown rather than on an offset, so every page costs the
+        same to fetch.
+        """
+        self.object_list = self.get_queryset()
+        vacations, next_cursor = await apaginate_keyset(self.object_list, self.get_ordering(), request.GET.get('cursor'), self.page_size)
+        context = self.get_context_data(object_list=vacations, next_cursor=next_cursor)
+        if self.show_facets:
+            context.update(await self.get_facets())
+        return self.render_to_response(context)
+
+    async def get_facets(self) -> Dict[str, Any]:
+        """
+        Return the valid filters and the filter options with their vacation
+        counts, all computed by a single grouped query (see facet_rows).
+        """
+        filters = self.get_filters()
+        rows = [row async for row in facet_rows(self.get_filtered_queryset(Vacation.objects.all()))]
+        countries, price_bands = build_facets(rows, filters.get('country'), filters.get('price'))
+        return {
+            "filters": filters,
+            "country_options": countries,
+            "price_options": price_bands,
+        }
 
     def get_context_data(self, **kwargs: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Add a 'liked' attribute to each vacation in the context
-        indicating whether the current user has liked it or not.
+        Add the search text, the current sort and links to the other sorts,
+        the query string of the next page, the image sizes of the cards and
+        today's date to the context.
         """
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-        vacations = context['vacations']
+        context["q"] = self.get_search()
+        context["sort"] = self.get_sort()
+        context["sort_options"] = [
+            (sort, label, self.page_query(sort=sort))
+            for sort, label in self.sort_labels.items()
+            if sort != 'relevance' or context["q"]
+        ]
+        if context.get("next_cursor"):
+            context["next_query"] = self.page_query(cursor=context["next_cursor"])
+        context["card_sizes"] = CARD_SIZES
         context["today"] = datetime.now().date()
-        for vacation in vacations:
-            vacation.liked = vacation.likes.filter(user=user).exists()
         return context
 
+class VacationCardsView(HomeView):
+    """
+    Render the next page of vacation cards without the surrounding layout.
+    This is fetched by the home page to implement infinite scrolling.
+    """
+    template_name = 'vacation_cards.html'
+    show_facets = False
+
 class UpdateVacationView(LoginRequiredMixin, StaffuserRequiredMixin, UpdateView):
     template_name = 'add_vacation.html'
     form_class = UpdateVacationForm
@@ -56,9 +227,19 @@ class UpdateVacationView(LoginRequiredMixin, StaffuserRequiredMixin, UpdateView)
     def form_valid(self, form: BaseForm) -> HttpResponse:
         """
         Save the form and add a success message to the request.
+
+        If a new image was uploaded, the resized copies of the previous one
+        are dropped and a job to make new ones is queued; the card shows the
+        new image itself meanwhile.
         """
         messages.success(self.request, "Vacation updated successfully")
-        return super().form_valid(form)
+        image_changed = 'image' in form.changed_data
+        if image_changed:
+            discard_variants(form.instance)
+        response = super().form_valid(form)
+        if image_changed:
+            enqueue_image_job(self.object)
+        return response
 
 class CreateVacationView(LoginRequiredMixin, StaffuserRequiredMixin, CreateView):
     template_name = 'add_vacation.html'
@@ -67,10 +248,14 @@ class CreateVacationView(LoginRequiredMixin, StaffuserRequiredMixin, CreateView)
 
     def form_valid(self, form: BaseForm) -> HttpResponse:
         """
-        Save the form and add a success message to the request.
+        Save the form, queue a job to make the resized copies of the
+        uploaded image (see vacations_app.jobs) and add a success message to
+        the request.
         """
         messages.success(self.request, "Vacation added successfully")
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        enqueue_image_job(self.object)
+        return response
 
 class DeleteVacationView(LoginRequiredMixin, StaffuserRequiredMixin, DeleteView):
     template_name = 'confirm_delete.html'
@@ -83,8 +268,63 @@ class DeleteVacationView(LoginRequiredMixin, StaffuserRequiredMixin, DeleteView)
         """
         messages.success(self.request, "Vacation deleted successfully")
         return super().form_valid(form)
+class ExportVacationsView(LoginRequiredMixin, StaffuserRequiredMixin, View):
+    # Each format's row generators for WSGI and for ASGI, and content type.
+    formats = {
+        'csv': (stream_csv, astream_csv, 'text/csv'),
+        'jsonl': (stream_jsonl, astream_jsonl, 'application/x-ndjson'),
+    }
+
+    def get(self, request: HttpRequest) -> StreamingHttpResponse:
+        """
+        Stream the vacations with their country and like counts as CSV or,
+        with ?format=jsonl, as JSON Lines.
+
+        The rows are read through a database cursor one chunk at a time and
+        written to the response as they arrive, so memory use stays the same
+        however large the catalog is. Under ASGI the rows come from an async
+        iterator: Django would read a sync one to the end before sending it.
+
+        With ?since=<ISO 8601 timestamp>, only the vacations changed after
+        that time are exported. The X-Export-Timestamp header holds the time
+        the export started, to be passed as ``since`` on the next run.
+        """
+        file_format = request.GET.get('format', 'csv')
+        if file_format not in self.formats:
+            raise BadRequest("format must be csv or jsonl.")
+        since = None
+        if request.GET.get('since'):
+            try:
+                since = parse_datetime(request.GET['since'])
+            except ValueError:
+                since = None
+            if since is None:
+                raise BadRequest("since must be an ISO 8601 timestamp.")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        started = timezone.now()
+        stream, astream, content_type = self.formats[file_format]
+        if isinstance(request, ASGIRequest):
+            stream = astream
+        response = StreamingHttpResponse(stream(export_queryset(since)), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="vacations-{started:%Y%m%d%H%M%S}.{file_format}"'
+        response['X-Export-Timestamp'] = started.isoformat()
+        return response
+
+def posted_vacation_id(request: HttpRequest) -> int:
+    """
+    Return the 'vacation_id' POST parameter as an integer, raising BadRequest
+    if it is missing, not a number, or out of the range of the primary key
+    column, which the database would refuse to compare with.
+    """
+    try:
+        vacation_id = int(request.POST['vacation_id'])
+        Vacation._meta.pk.run_validators(vacation_id)
+    except (KeyError, ValueError, ValidationError):
+        raise BadRequest("A valid vacation_id is required.")
+    return vacation_id
 @login_required
-def unlike_vacation(request: HttpRequest) -> HttpResponse:
+async def unlike_vacation(request: HttpRequest) -> HttpResponse:
     
     
     """
@@ -101,28 +341,57 @@ def unlike_vacation(request: HttpRequest) -> HttpResponse:
     :param request: The request object.
     :return: An HttpResponse object.
     """
-    if request.user.is_staff:
+    user = await request.auser()
+    if user.is_staff:
         return HttpResponseForbidden("Admins are not allowed to do this.")
-    vacation = Vacation.objects.get(id=request.POST['vacation_id'])
-    like = Likes.objects.filter(vacation=vacation, user=request.user)
-    if not like:
+    if await Likes.objects.aunlike(user, posted_vacation_id(request)) is None:
         return HttpResponseForbidden("You haven't liked this vacation yet.")
-    like.delete()
     return redirect('home')
 @login_required
-def like_vacation(request: HttpRequest) -> HttpResponse:
+async def like_vacation(request: HttpRequest) -> HttpResponse:
     """
     Like a vacation. This view is supposed to be called via a POST request with
     a 'vacation_id' parameter. It creates a like in the database and redirects
     to the home page.
 
+    The like is written with a single upsert, so liking an already liked
+    vacation (for example on a double click) returns a 403 response instead
+    of failing on the unique constraint. Only in that case is the vacation
+    looked up, to return a 404 response if it does not exist.
+
     If the user is a staff member, it returns a 403 Forbidden response.
     """
-    if request.user.is_staff:
+    user = await request.auser()
+    if user.is_staff:
         return HttpResponseForbidden("Admins are not allowed to do this.")
-    vacation = Vacation.objects.get(id=request.POST['vacation_id'])
-    like = Likes.objects.filter(vacation=vacation, user=request.user)
-    if like:
+    vacation_id = posted_vacation_id(request)
+    if await Likes.objects.alike(user, vacation_id) is None:
+        if not await Vacation.objects.filter(id=vacation_id).aexists():
+            raise Http404("Vacation does not exist.")
         return HttpResponseForbidden("You have already liked this vacation.")
-    Likes.objects.create(vacation=vacation, user=request.user)
     return redirect('home')
+@login_required
+@require_POST
+async def toggle_like(request: HttpRequest) -> JsonResponse:
+    """
+    Like or unlike a vacation and return the new state as JSON.
+
+    This view is called by the home page script with a POST request holding a
+    'vacation_id' parameter. If the user has not liked the vacation yet, a
+    like is added, otherwise the existing like is removed. The response is
+    {"liked": bool, "likes_count": int}, which the script uses to update the
+    like button in place instead of reloading the whole page.
+
+    If the user is a staff member, it returns a 403 response.
+    """
+    user = await request.auser()
+    if user.is_staff:
+        return JsonResponse({"error": "Admins are not allowed to do this."}, status=403)
+    vacation_id = posted_vacation_id(request)
+    likes_count = await Likes.objects.alike(user, vacation_id)
+    liked = likes_count is not None
+    if not liked:
+        likes_count = await Likes.objects.aunlike(user, vacation_id)
+        if likes_count is None:
+            raise Http404("Vacation does not exist.")
+    return JsonResponse({"liked": liked, "likes_count": likes_count})
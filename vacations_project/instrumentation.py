@@ -0,0 +1,164 @@
+"""
+Per-request query counts and timings.
+
+RequestTimingMiddleware measures, for every request, the number of SQL
+queries run and the time spent running them, rendering templates and
+handling the whole request. The figures are added to the response as a
+Server-Timing header, which browsers show next to the request in their
+developer tools, and logged on one line keyed by URL name to the
+'vacations_project.requests' logger. Requests running more queries than
+REQUEST_QUERY_WARNING_THRESHOLD are logged as warnings, which is how N+1
+regressions show up.
+
+The work per query is a context variable lookup and two clock reads, so the
+middleware is meant to stay on in production.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+
+logger = logging.getLogger('vacations_project.requests')
+
+
+class RequestTimings:
+    """
+    The number of queries run while handling one request and the time spent
+    in the database and in template rendering, in seconds.
+    """
+    __slots__ = ('started', 'queries', 'db', 'template')
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+
+
+# The timings of the request being handled. Context variables follow the
+# request into the threads that sync_to_async runs its blocking code in.
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar('current_timings', default=None)
+
+
+def time_query(execute, sql, params, many, context):
+    """
+    Execute wrapper adding each query to the timings of the current request,
+    if there is one.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db += time.perf_counter() - started
+
+
+def install_query_timer(**kwargs) -> None:
+    """
+    Add time_query to the execute wrappers of this thread's database
+    connections, if it is not there yet.
+
+    This runs on request_started, which is sent in the thread that goes on
+    to run the request's queries, including the thread async views hand
+    their queries to. It is put first in the list so that it is not the
+    one removed when a connection.execute_wrapper() block ends.
+    """
+    for connection in connections.all():
+        if time_query not in connection.execute_wrappers:
+            connection.execute_wrappers.insert(0, time_query)
+
+
+class RequestTimingMiddleware:
+    """
+    Measure every request (see the module docstring). It should come first
+    in MIDDLEWARE, so the total time covers the other middleware and the
+    template time is measured right around rendering.
+
+    The body of a streaming response is produced after the middleware has
+    returned, so its queries are not counted.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        request_started.connect(install_query_timer, dispatch_uid='install_query_timer')
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        self.report(request, response, timings)
+        return response
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        self.report(request, response, timings)
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        Time the rendering of template responses, which happens after this
+        hook returns.
+        """
+        timings = current_timings.get()
+        if timings is not None:
+            started = time.perf_counter()
+
+            def rendered(response) -> None:
+                timings.template += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def report(self, request, response, timings: RequestTimings) -> None:
+        """
+        Add the Server-Timing header to ``response`` and log the timings of
+        the request.
+        """
+        total = time.perf_counter() - timings.started
+        server_timing = (
+            f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} queries", '
+            f'tpl;dur={timings.template * 1000:.1f}, total;dur={total * 1000:.1f}'
+        )
+        if response.has_header('Server-Timing'):
+            server_timing = f"{response['Server-Timing']}, {server_timing}"
+        response['Server-Timing'] = server_timing
+
+        threshold = settings.REQUEST_QUERY_WARNING_THRESHOLD
+        level = logging.WARNING if threshold is not None and timings.queries > threshold else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        match = request.resolver_match
+        fields = {
+            'url_name': match.view_name if match else None,
+            'method': request.method,
+            'status': response.status_code,
+            'queries': timings.queries,
+            'db_ms': round(timings.db * 1000, 1),
+            'template_ms': round(timings.template * 1000, 1),
+            'total_ms': round(total * 1000, 1),
+        }
+        logger.log(level, ' '.join(f'{name}=%s' for name in fields), *fields.values(), extra={'timings': fields})
@@ -0,0 +1,50 @@
+from django.core.cache import cache
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.formats import localize
+from jinja2 import Environment
+from markupsafe import Markup
+
+# Lifetime of a cached vacation card, matching the {% cache %} tag in the
+# Django version of vacation_cards.html.
+CARD_CACHE_TIMEOUT = 86400
+
+
+def url(name: str, *args) -> str:
+    """
+    Reverse a URL pattern name, like the {% url %} tag.
+    """
+    return reverse(name, args=args)
+
+
+def cached_fragment(key: str):
+    """
+    Return the cached HTML fragment stored under ``key``, or None.
+    """
+    value = cache.get(key)
+    return None if value is None else Markup(value)
+
+
+def cache_fragment(key: str, value: str) -> str:
+    """
+    Cache an HTML fragment under ``key`` and return an empty string, so it
+    can be called from an expression.
+    """
+    cache.set(key, str(value), CARD_CACHE_TIMEOUT)
+    return ''
+
+
+def environment(**options) -> Environment:
+    """
+    Return the Jinja2 environment used by the optional Jinja2 versions of
+    the home page templates in jinja2/.
+    """
+    env = Environment(**options)
+    env.globals.update(
+        static=static,
+        url=url,
+        cached_fragment=cached_fragment,
+        cache_fragment=cache_fragment,
+    )
+    env.filters['localize'] = localize
+    return env
@@ -37,11 +37,14 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'rest_framework',
     'vacations_app',
     'users_app',
 ]
 
 MIDDLEWARE = [
+    # First, so the timings it reports cover the rest of the stack.
+    'vacations_project.instrumentation.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -68,6 +71,30 @@ TEMPLATES = [
     },
 ]
 
+# The home page also has Jinja2 versions of its templates in jinja2/, used
+# when FEED_TEMPLATE_ENGINE is 'jinja2' and the jinja2 package is installed.
+try:
+    import jinja2
+except ImportError:  # jinja2 is optional
+    jinja2 = None
+
+if jinja2 is not None:
+    TEMPLATES.append({
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [BASE_DIR / 'jinja2'],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'environment': 'vacations_project.jinja2.environment',
+            'context_processors': [
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    })
+
+# Name of the template engine rendering the home feed: 'django' or 'jinja2'.
+FEED_TEMPLATE_ENGINE = 'django'
+
 WSGI_APPLICATION = 'vacations_project.wsgi.application'
 
 
@@ -86,6 +113,85 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Used for the rendered vacation cards on the home page.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'vacations',
+        # Room for one cached card per vacation; the default of 300 entries
+        # would evict cards on every page view of a larger catalog.
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    }
+}
+
+
+# Request instrumentation
+# RequestTimingMiddleware adds a Server-Timing header to every response and
+# logs the queries and timings of every request to the
+# 'vacations_project.requests' logger, as a warning when a request runs more
+# than REQUEST_QUERY_WARNING_THRESHOLD queries (None never warns).
+
+REQUEST_QUERY_WARNING_THRESHOLD = 30
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'vacations_project.requests': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+
+# Sessions and authentication
+# Sessions are read from the cache and written through to the database, and
+# CachedModelBackend caches the logged-in user for USER_CACHE_TIMEOUT
+# seconds, so a request that hits the cache costs no query before the view
+# runs. Compare with python manage.py benchmark_auth.
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+AUTHENTICATION_BACKENDS = ['users_app.backends.CachedModelBackend']
+
+USER_CACHE_TIMEOUT = 60
+
+# Login and signup attempts allowed per client IP address and per username,
+# as token buckets of (burst, attempts per minute); see users_app.throttling.
+# An empty dict turns throttling off, for instance for load tests.
+AUTH_THROTTLE_RATES = {
+    'ip': (20, 10),
+    'username': (5, 5),
+}
+
+THROTTLE_CACHE = 'default'
+
+# Passwords are hashed with PBKDF2-SHA256 at PASSWORD_PBKDF2_ITERATIONS
+# iterations, chosen with python manage.py benchmark_hashers for the CPU
+# time a login may take. A stored hash made with another iteration count or
+# one of the other hashers is rewritten at the user's next login.
+
+PASSWORD_PBKDF2_ITERATIONS = 1_000_000
+
+PASSWORD_HASHERS = [
+    'users_app.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -126,9 +232,35 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'  # Or another path where you want collected files
 
+# Outside of development, collectstatic writes content-hashed copies of the
+# static files plus precompressed .gz/.br siblings, so they can be served
+# with far-future cache headers (see README).
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+        else 'vacations_project.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Resized copies of large static images, made by the build_static_images
+# command and committed next to the original.
+STATIC_IMAGE_VARIANTS = {
+    'images/vacation-bg.jpg': (800, 1280, 1920),
+}
+
 MEDIA_URL = '/uploads/'
 MEDIA_ROOT = BASE_DIR / 'uploads'
 
+# Resized copies of uploaded vacation images are made by the
+# process_image_jobs worker (see vacations_app.jobs). A failing job is tried
+# IMAGE_JOB_MAX_ATTEMPTS times, and one running for more than
+# IMAGE_JOB_TIMEOUT seconds is assumed abandoned and run again.
+IMAGE_JOB_MAX_ATTEMPTS = 3
+IMAGE_JOB_TIMEOUT = 600
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,164 @@
+"""
+Production settings for vacations_project.
+
+Use with DJANGO_SETTINGS_MODULE=vacations_project.settings_production. Every
+value that differs between deployments is read from an environment variable;
+the rest comes from settings.py.
+
+Database connections are reused across requests instead of being opened and
+closed for every request:
+
+- By default a connection is kept open for DATABASE_CONN_MAX_AGE seconds and
+  checked with a cheap query before its first use in each request, so a
+  connection dropped by the server is replaced instead of failing the request.
+- With DATABASE_POOL=1, psycopg 3's connection pool is used instead, holding
+  between DATABASE_POOL_MIN_SIZE and DATABASE_POOL_MAX_SIZE connections per
+  process. This needs the psycopg[pool] package rather than psycopg2, and is
+  the better choice under ASGI, where persistent connections are not reused
+  across requests.
+
+Compare the two with the benchmark_connections command.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, CACHES, DATABASES, LOGGING, PASSWORD_PBKDF2_ITERATIONS, STORAGES, TEMPLATES
+
+
+def env(name: str, default=None) -> str:
+    """
+    Return the environment variable ``name``, or ``default`` if it is unset
+    or empty. Raises ImproperlyConfigured if there is no default.
+    """
+    value = os.environ.get(name) or default
+    if value is None:
+        raise ImproperlyConfigured(f"Set the {name} environment variable.")
+    return value
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    """
+    Return the environment variable ``name`` as a boolean.
+    """
+    return env(name, '1' if default else '0').lower() in ('1', 'true', 'yes', 'on')
+
+
+SECRET_KEY = env('DJANGO_SECRET_KEY')
+
+DEBUG = env_bool('DJANGO_DEBUG')
+
+ALLOWED_HOSTS = [host.strip() for host in env('DJANGO_ALLOWED_HOSTS', '').split(',') if host.strip()]
+
+STORAGES = {
+    **STORAGES,
+    'staticfiles': {
+        'BACKEND': 'vacations_project.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+STATIC_ROOT = env('DJANGO_STATIC_ROOT', str(BASE_DIR / 'staticfiles'))
+
+
+# Templates
+# Compiled templates are kept in memory for the life of the process. Django
+# already does this when no loaders are given; they are listed here so the
+# behaviour does not depend on that default.
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+    *TEMPLATES[1:],
+]
+
+FEED_TEMPLATE_ENGINE = env('DJANGO_FEED_TEMPLATE_ENGINE', 'django')
+
+
+# Cache
+# Cached sessions need a cache shared by every worker process: with the
+# per-process default, a session ended in one process would stay valid in
+# the others. Without DJANGO_CACHE_URL (a redis:// URL, which needs the redis
+# package) sessions are read from the database, and only the short-lived
+# user cache stays per process.
+
+CACHE_URL = env('DJANGO_CACHE_URL', '')
+
+if CACHE_URL:
+    CACHES = {
+        **CACHES,
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        },
+    }
+else:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+
+
+# Password hashing
+# Set DJANGO_PBKDF2_ITERATIONS to the count benchmark_hashers recommends on
+# the production servers.
+
+PASSWORD_PBKDF2_ITERATIONS = int(env('DJANGO_PBKDF2_ITERATIONS', str(PASSWORD_PBKDF2_ITERATIONS)))
+
+
+# Request instrumentation
+# Every request is logged with its query count and timings unless
+# DJANGO_REQUEST_LOG_LEVEL is raised to WARNING, which keeps only the
+# requests over the query threshold.
+
+REQUEST_QUERY_WARNING_THRESHOLD = int(env('DJANGO_QUERY_WARNING_THRESHOLD', '30'))
+
+LOGGING = {
+    **LOGGING,
+    'loggers': {
+        **LOGGING['loggers'],
+        'vacations_project.requests': {
+            **LOGGING['loggers']['vacations_project.requests'],
+            'level': env('DJANGO_REQUEST_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
+
+# Database
+# https://docs.djangoproject.com/en/5.2/ref/databases/#persistent-connections
+# https://docs.djangoproject.com/en/5.2/ref/databases/#connection-pool
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'NAME': env('DATABASE_NAME', DATABASES['default']['NAME']),
+        'USER': env('DATABASE_USER', DATABASES['default']['USER']),
+        'PASSWORD': env('DATABASE_PASSWORD'),
+        'HOST': env('DATABASE_HOST', DATABASES['default']['HOST']),
+        'PORT': env('DATABASE_PORT', DATABASES['default']['PORT']),
+    }
+}
+
+if env_bool('DATABASE_POOL'):
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(env('DATABASE_POOL_MIN_SIZE', '2')),
+            'max_size': int(env('DATABASE_POOL_MAX_SIZE', '10')),
+            'timeout': float(env('DATABASE_POOL_TIMEOUT', '10')),
+        },
+    }
+    # Connections go back to the pool at the end of each request.
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = int(env('DATABASE_CONN_MAX_AGE', '60'))
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
@@ -0,0 +1,40 @@
+"""
+Settings for a fast run of the test suite:
+
+    python manage.py test --settings=vacations_project.settings_test --parallel
+
+The tests run against an in-memory SQLite database instead of PostgreSQL,
+so the tests of PostgreSQL-only features such as full-text search are
+skipped; run the suite with the default settings before a release. New
+passwords are hashed with MD5 and the PBKDF2 hashes of the fixture users are
+checked only once per process (see vacations_project.testing). Uploaded
+files go to a temporary copy of uploads/, and the runner prints the slowest
+tests (--slowest N).
+"""
+
+import atexit
+import shutil
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+    'vacations_project.testing.MemoizedPBKDF2PasswordHasher',
+]
+
+# Parallel workers are forked from the main process and share this
+# directory; the file storage never overwrites an existing file.
+MEDIA_ROOT = tempfile.mkdtemp(prefix='vacations-test-media-')
+shutil.copytree(BASE_DIR / 'uploads', MEDIA_ROOT, dirs_exist_ok=True)
+atexit.register(shutil.rmtree, MEDIA_ROOT, ignore_errors=True)
+
+TEST_RUNNER = 'vacations_project.testing.TimedTestRunner'
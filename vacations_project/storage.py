@@ -0,0 +1,55 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Static files storage that writes content-hashed copies of every file
+    (through ManifestStaticFilesStorage) and precompressed .gz and, if the
+    brotli package is installed, .br siblings of the text files.
+
+    The web server can then serve the hashed files with far-future cache
+    headers and pick the precompressed sibling matching the request's
+    Accept-Encoding without compressing anything per request.
+    """
+    compressible_extensions = ('.css', '.js', '.svg', '.ico', '.txt', '.html', '.json', '.map')
+
+    def post_process(self, paths, dry_run=False, **options):
+        """
+        Hash the collected files as usual, then compress the hashed copies of
+        the text files. Compressed files are only kept if they are smaller
+        than the original.
+        """
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for hashed_name in sorted(hashed_names):
+            if hashed_name.endswith(self.compressible_extensions):
+                self.compress(hashed_name)
+
+    def compress(self, name: str) -> None:
+        """
+        Write the .gz and .br siblings of a stored file.
+        """
+        with self.open(name) as original:
+            content = original.read()
+        compressed = {'gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed['br'] = brotli.compress(content, quality=11)
+        for extension, data in compressed.items():
+            compressed_name = f'{name}.{extension}'
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            if len(data) < len(content):
+                self._save(compressed_name, ContentFile(data))
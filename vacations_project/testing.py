@@ -0,0 +1,161 @@
+"""
+Helpers that keep the test suite fast, used by the tests and by the test
+settings profile (settings_test.py).
+
+- load_initial_data() loads initial_data.json, parsing it only once per
+  process however many test cases load it.
+- sample_jpeg() builds the small JPEG the upload tests post, once per process.
+- MemoizedPBKDF2PasswordHasher checks each fixture password only once.
+- TimedTestRunner reports the slowest tests, also under --parallel.
+"""
+
+import functools
+import io
+import time
+import unittest
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.runner import DiscoverRunner, ParallelTestSuite, RemoteTestResult, RemoteTestRunner
+from PIL import Image
+
+INITIAL_DATA = settings.BASE_DIR / 'initial_data.json'
+
+
+@functools.cache
+def initial_data() -> list:
+    """
+    Return the deserialized objects of initial_data.json.
+    """
+    with open(INITIAL_DATA) as fixture:
+        return list(serializers.deserialize('json', fixture.read(), ignorenonexistent=True))
+
+
+def load_initial_data(using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Save the objects of initial_data.json, like
+    call_command('loaddata', 'initial_data.json') but without finding and
+    parsing the file again for every test case.
+
+    The objects are saved raw, so model save() methods and signals do not
+    run, and the primary key sequences are reset afterwards, as loaddata
+    does.
+    """
+    objects = initial_data()
+    for deserialized in objects:
+        deserialized.save(using=using)
+    connection = connections[using]
+    sequence_sql = connection.ops.sequence_reset_sql(no_style(), {type(deserialized.object) for deserialized in objects})
+    if sequence_sql:
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
+
+
+@functools.cache
+def sample_jpeg(width: int = 100, height: int = 100, color: str = 'red') -> bytes:
+    """
+    Return the bytes of a JPEG image of a single color.
+    """
+    image_io = io.BytesIO()
+    Image.new('RGB', (width, height), color=color).save(image_io, format='JPEG')
+    return image_io.getvalue()
+
+
+class MemoizedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 hasher remembering the passwords it has checked. For tests only.
+
+    The users in initial_data.json have hashes with 1,000,000 iterations,
+    which take about half a second to check. Tests log these users in again
+    and again, so each (password, hash) pair is only checked once per
+    process.
+    """
+    _verified = {}
+
+    def verify(self, password, encoded):
+        key = (password, encoded)
+        if key not in self._verified:
+            self._verified[key] = super().verify(password, encoded)
+        return self._verified[key]
+
+
+class TimedRemoteTestResult(RemoteTestResult):
+    """
+    Result of a --parallel worker that also sends the time each test took
+    to the main process, as an addTiming event.
+    """
+
+    def startTest(self, test):
+        self._started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        self.events.append(('addTiming', self.test_index, time.perf_counter() - self._started))
+        super().stopTest(test)
+
+
+class TimedRemoteTestRunner(RemoteTestRunner):
+    resultclass = TimedRemoteTestResult
+
+
+class TimedParallelTestSuite(ParallelTestSuite):
+    runner_class = TimedRemoteTestRunner
+
+
+class TimedTextTestResult(unittest.TextTestResult):
+    """
+    Text result recording how long each test took, including its setUp()
+    and tearDown().
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = []
+        self._timing = None
+
+    def startTest(self, test):
+        self._started = time.perf_counter()
+        self._timing = None
+        super().startTest(test)
+
+    def addTiming(self, test, elapsed):
+        # Sent by parallel workers, where the events are replayed here long
+        # after the test ran.
+        self._timing = elapsed
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        elapsed = self._timing if self._timing is not None else time.perf_counter() - self._started
+        self.timings.append((elapsed, test.id()))
+
+
+class TimedTestRunner(DiscoverRunner):
+    """
+    Test runner printing the --slowest tests after the run.
+    """
+    parallel_test_suite = TimedParallelTestSuite
+
+    def __init__(self, slowest: int = 10, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.slowest = slowest
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--slowest', type=int, default=10, metavar='N', help="Show the N slowest tests (0 for none).")
+
+    def get_resultclass(self):
+        return super().get_resultclass() or TimedTextTestResult
+
+    def run_suite(self, suite, **kwargs):
+        result = super().run_suite(suite, **kwargs)
+        timings = getattr(result, 'timings', None)
+        if self.slowest and timings:
+            self.log(f"\nSlowest {min(self.slowest, len(timings))} tests of {len(timings)}:")
+            for elapsed, test_id in sorted(timings, reverse=True)[:self.slowest]:
+                self.log(f"{elapsed:8.3f}s  {test_id}")
+        return result